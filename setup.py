@@ -42,6 +42,7 @@ setup(
         "beautifulsoup4>=4.12.0",
         "scipy>=1.11.0",
         "numpy>=1.24.0",
+        "orjson>=3.9.0",
         "python-slugify>=8.0.0",
         "slugify>=0.0.1",
         # Temporarily commented out for development installation
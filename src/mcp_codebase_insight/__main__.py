@@ -66,9 +66,12 @@ def main():
             host=config.host,
             port=config.port,
             log_level=config.log_level.lower(),
+            # Picks uvloop and httptools when they are installed
             loop="auto",
             lifespan="on",
-            workers=1
+            workers=1,
+            # Skip a log line per request unless debugging
+            access_log=config.debug_mode
         )
         
     except Exception as e:
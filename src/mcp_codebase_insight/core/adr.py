@@ -66,6 +66,10 @@ class ADRManager:
         self.next_adr_number = 1  # Default to 1, will be updated in initialize()
         self.initialized = False
         self.adrs: Dict[UUID, ADR] = {}
+        # ADRs on disk sorted by creation time, by status filter; rebuilt
+        # after a save or when the directory's modification time changes
+        self._listings: Dict[Optional[str], List[ADR]] = {}
+        self._listings_mtime: Optional[int] = None
         
     async def initialize(self):
         """Initialize the ADR manager.
@@ -214,20 +218,46 @@ class ADRManager:
     
     async def list_adrs(
         self,
-        status: Optional[ADRStatus] = None
+        status: Optional[ADRStatus] = None,
+        limit: Optional[int] = None
     ) -> List[ADR]:
-        """List all ADRs, optionally filtered by status."""
-        adrs = []
-        for path in self.adr_dir.glob("*.json"):
-            with open(path) as f:
-                data = json.load(f)
-                adr = ADR(**data)
-                if not status or adr.status == status:
-                    adrs.append(adr)
-        return sorted(adrs, key=lambda x: x.created_at)
+        """List all ADRs, optionally filtered by status.
+        
+        The ADRs are copies, so callers may change them without affecting
+        later listings.
+        """
+        try:
+            mtime = os.stat(self.adr_dir).st_mtime_ns
+        except FileNotFoundError:
+            # The directory was removed: there are no ADRs to list
+            self._listings.clear()
+            self._listings_mtime = None
+            return []
+        if mtime != self._listings_mtime:
+            self._listings.clear()
+            self._listings_mtime = mtime
+            
+        status = status or None
+        adrs = self._listings.get(status)
+        if adrs is None:
+            adrs = self._listings.get(None)
+            if adrs is None:
+                adrs = []
+                for path in self.adr_dir.glob("*.json"):
+                    with open(path) as f:
+                        data = json.load(f)
+                        adrs.append(ADR(**data))
+                adrs.sort(key=lambda x: x.created_at)
+                self._listings[None] = adrs
+            if status is not None:
+                adrs = [adr for adr in adrs if adr.status == status]
+            self._listings[status] = adrs
+            
+        return [adr.model_copy(deep=True) for adr in adrs[:limit]]
     
     async def _save_adr(self, adr: ADR) -> None:
         """Save ADR to file."""
         adr_path = self.adr_dir / f"{adr.id}.json"
         with open(adr_path, "w") as f:
             json.dump(adr.model_dump(), f, indent=2, default=str)
+        self._listings.clear()
@@ -66,8 +66,9 @@ class SentenceTransformerEmbedding:
             # Convert single string to list for consistent handling
             texts = [text] if isinstance(text, str) else text
             
-            # Generate embeddings
-            embeddings = self.model.encode(
+            # Generate embeddings off the event loop
+            embeddings = await asyncio.to_thread(
+                self.model.encode,
                 texts,
                 convert_to_tensor=False,  # Return numpy array
                 normalize_embeddings=True  # L2 normalize embeddings
@@ -92,7 +93,8 @@ class SentenceTransformerEmbedding:
             all_embeddings = []
             for i in range(0, len(texts), batch_size):
                 batch = texts[i:i + batch_size]
-                embeddings = self.model.encode(
+                embeddings = await asyncio.to_thread(
+                    self.model.encode,
                     batch,
                     convert_to_tensor=False,
                     normalize_embeddings=True,
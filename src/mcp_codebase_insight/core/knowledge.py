@@ -2,12 +2,133 @@
 
 from datetime import datetime
 from enum import Enum
-from typing import Dict, List, Optional
+from pathlib import Path
+from typing import Any, Callable, Dict, FrozenSet, Iterator, List, Optional, Sequence, Set, Tuple
 from uuid import UUID, uuid4
-import json
+import asyncio
+import hashlib
+import heapq
+import logging
+import os
+import re
+import sys
 
+import numpy as np
+import orjson
 from pydantic import BaseModel, Field
 
+from .cache import MemoryCache
+
+logger = logging.getLogger(__name__)
+
+# Maximum number of records waiting to be written by the background writer
+SAVE_QUEUE_MAXSIZE = 1024
+
+# Pattern embeddings are persisted next to the pattern JSON as raw float16
+EMBEDDING_SUFFIX = ".emb"
+EMBEDDING_DTYPE = np.float16
+
+# Number of points sent per upsert when restoring the vector store
+RESTORE_BATCH_SIZE = 256
+
+# Number of records parsed per worker thread when loading from disk
+LOAD_CHUNK_SIZE = 64
+
+# Seconds between flushes of changed relationships and web sources
+FLUSH_INTERVAL = 0.5
+
+# Largest knowledge base searched in process instead of via the vector store
+LOCAL_SEARCH_MAX_PATTERNS = 2048
+
+# Number of query embeddings kept for repeated similarity searches
+QUERY_EMBED_CACHE_SIZE = 1024
+
+# Lower bound on embedding norms when normalizing, so a zero embedding
+# scores 0 instead of producing NaNs
+_MIN_NORM = 1e-12
+
+# Matches a UUID embedded in a vector store point ID
+_UUID_RE = re.compile(
+    r'([a-f0-9]{8}-[a-f0-9]{4}-[a-f0-9]{4}-[a-f0-9]{4}-[a-f0-9]{12})', re.IGNORECASE
+)
+
+def _try_uuid(value: str) -> Optional[UUID]:
+    """Parse value as a UUID, returning None if it is not one."""
+    try:
+        return UUID(value)
+    except (ValueError, AttributeError, TypeError):
+        return None
+
+def _extract_id_and_score(result: Any) -> Tuple[Optional[UUID], float]:
+    """Extract the pattern UUID and score from a vector store search result.
+    
+    Handles result objects with id/score attributes as well as the
+    (id, score, payload) tuples returned by newer Qdrant clients.
+    """
+    if hasattr(result, 'id'):
+        raw_id = result.id
+        score = getattr(result, 'score', 0.0)
+    elif isinstance(result, tuple) and result:
+        raw_id = result[0]
+        score = result[1] if len(result) >= 2 else 0.0
+    else:
+        return None, 0.0
+        
+    id_str = str(raw_id)
+    pattern_id = _try_uuid(id_str)
+    if pattern_id is None:
+        # Look for an embedded UUID like xxxxxxxx-xxxx-xxxx-xxxx-xxxxxxxxxxxx
+        uuid_match = _UUID_RE.search(id_str)
+        if uuid_match:
+            pattern_id = UUID(uuid_match.group(1))
+    return pattern_id, score
+
+def _stable_filename(key: str) -> str:
+    """Return a filename for key that is stable across processes.
+    
+    Unlike hash(), which is salted per process, the digest lets a record
+    saved in one run be overwritten in the next.
+    """
+    return f"{hashlib.blake2b(key.encode(), digest_size=16).hexdigest()}.json"
+
+def _iter_json_files(directory: Path) -> Iterator[Path]:
+    """Yield JSON files in directory.
+    
+    Uses os.scandir so the file type comes from the directory entry instead
+    of an extra stat() per file as with Path.glob(). Symlinks are not
+    followed, so no entry needs a stat() even when d_type is available.
+    """
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if entry.name.endswith(".json") and entry.is_file(follow_symlinks=False):
+                yield Path(entry.path)
+
+def _intern_all(values: Optional[List[str]]) -> Optional[List[str]]:
+    """Intern a list of strings so duplicates across records share storage."""
+    if not values:
+        return values
+    return [sys.intern(v) for v in values]
+
+def _read_file(path: Path) -> Optional[bytes]:
+    """Read path, returning None if it does not exist."""
+    try:
+        return path.read_bytes()
+    except FileNotFoundError:
+        return None
+
+def _write_file(path: Path, payload: Optional[bytes]) -> None:
+    """Write payload to path, or remove path when payload is None.
+    
+    The payload is written to a temporary file that then replaces path, so
+    a crash mid-write never leaves a truncated record behind.
+    """
+    if payload is None:
+        path.unlink(missing_ok=True)
+    else:
+        tmp_path = path.with_name(f"{path.name}.tmp")
+        tmp_path.write_bytes(payload)
+        os.replace(tmp_path, path)
+
 class PatternType(str, Enum):
     """Pattern type enumeration."""
     
@@ -27,6 +148,9 @@ class PatternConfidence(str, Enum):
     LOW = "low"
     EXPERIMENTAL = "experimental"
 
+# Payload strings for each pattern type, looked up once instead of per call
+_PATTERN_TYPE_VALUES = {pt: pt.value for pt in PatternType}
+
 class Pattern(BaseModel):
     """Pattern model."""
     
@@ -72,6 +196,70 @@ class WebSource(BaseModel):
     related_patterns: Optional[List[UUID]] = None
     tags: Optional[List[str]] = None
 
+def _parse_uuids(values: Optional[List[str]]) -> Optional[List[UUID]]:
+    """Parse a list of UUID strings read from disk."""
+    return [UUID(v) for v in values] if values is not None else None
+
+def _construct_pattern(record: Dict[str, Any]) -> Pattern:
+    """Build a Pattern from a record this knowledge base wrote.
+    
+    Records were validated when saved, so only the UUID, enum and datetime
+    fields are converted instead of running full model validation.
+    """
+    record["id"] = UUID(record["id"])
+    record["type"] = PatternType(record["type"])
+    record["confidence"] = PatternConfidence(record["confidence"])
+    record["created_at"] = datetime.fromisoformat(record["created_at"])
+    record["updated_at"] = datetime.fromisoformat(record["updated_at"])
+    record["related_patterns"] = _parse_uuids(record.get("related_patterns"))
+    return Pattern.model_construct(**record)
+
+def _construct_relationship(record: Dict[str, Any]) -> FileRelationship:
+    """Build a FileRelationship from a record this knowledge base wrote."""
+    record["created_at"] = datetime.fromisoformat(record["created_at"])
+    record["updated_at"] = datetime.fromisoformat(record["updated_at"])
+    return FileRelationship.model_construct(**record)
+
+def _construct_web_source(record: Dict[str, Any]) -> WebSource:
+    """Build a WebSource from a record this knowledge base wrote."""
+    record["last_fetched"] = datetime.fromisoformat(record["last_fetched"])
+    record["related_patterns"] = _parse_uuids(record.get("related_patterns"))
+    return WebSource.model_construct(**record)
+
+def _matches_filters(
+    meta: Optional[Dict[str, Any]],
+    pattern_type: Optional[PatternType],
+    confidence: Optional[PatternConfidence],
+    tag_set: FrozenSet[str]
+) -> bool:
+    """Check indexed pattern metadata against list/search filters."""
+    if meta is None:
+        return False
+    if pattern_type and meta["type"] != pattern_type:
+        return False
+    if confidence and meta["confidence"] != confidence:
+        return False
+    if tag_set and not meta["tags"].issuperset(tag_set):
+        return False
+    return True
+
+def _pattern_embed_text(pattern: Pattern) -> str:
+    """Return the text embedded for a pattern."""
+    return f"{pattern.name}\n{pattern.description}\n{pattern.content}"
+
+def _parse_records(blobs: Sequence[Any], construct: Callable[[Dict[str, Any]], Any]) -> List[Any]:
+    """Parse raw records with construct, returning the exception for any failure."""
+    results = []
+    for blob in blobs:
+        if isinstance(blob, Exception):
+            results.append(blob)
+            continue
+        try:
+            results.append(construct(orjson.loads(blob)))
+        except Exception as e:
+            results.append(e)
+    return results
+
 class KnowledgeBase:
     """Knowledge base for managing code patterns and insights."""
     
@@ -85,9 +273,35 @@ class KnowledgeBase:
         self.config = config
         self.vector_store = vector_store
         self.kb_dir = config.kb_storage_dir
+        self._patterns_dir = self.kb_dir / "patterns"
+        self._rels_dir = self.kb_dir / "relationships"
+        self._web_dir = self.kb_dir / "web_sources"
         self.initialized = False
         self.file_relationships: Dict[str, FileRelationship] = {}
+        # Relationship keys by source and target file, for filtered lookups.
+        # Dicts rather than sets, so keys keep their insertion order.
+        self._by_source: Dict[str, Dict[str, None]] = {}
+        self._by_target: Dict[str, Dict[str, None]] = {}
         self.web_sources: Dict[str, WebSource] = {}
+        # Tag sets of web sources by URL, for tag filtering
+        self._web_source_tags: Dict[str, FrozenSet[str]] = {}
+        # Filterable pattern metadata by ID, so listing needs no full scan
+        self._pattern_index: Dict[UUID, Dict[str, Any]] = {}
+        # Pattern embeddings for in-process search of small knowledge bases;
+        # the stacked, normalized matrix is rebuilt lazily after changes
+        self._embeddings: Dict[UUID, np.ndarray] = {}
+        self._matrix: Optional[np.ndarray] = None
+        self._matrix_ids: List[UUID] = []
+        # Records queued for the background writer; None marks a pending delete
+        self._pending_saves: Dict[Path, Optional[bytes]] = {}
+        self._save_queue: asyncio.Queue = asyncio.Queue(maxsize=SAVE_QUEUE_MAXSIZE)
+        self._writer_task: Optional[asyncio.Task] = None
+        # Relationship keys and web source URLs changed since the last flush
+        self._dirty_rels: Set[str] = set()
+        self._dirty_sources: Set[str] = set()
+        self._flusher_task: Optional[asyncio.Task] = None
+        # Query embeddings keyed by a digest of the query text
+        self._query_embed_cache = MemoryCache(max_size=QUERY_EMBED_CACHE_SIZE)
     
     async def initialize(self):
         """Initialize knowledge base components."""
@@ -97,69 +311,204 @@ class KnowledgeBase:
         try:
             # Create all required directories
             self.kb_dir.mkdir(parents=True, exist_ok=True)
-            (self.kb_dir / "patterns").mkdir(parents=True, exist_ok=True)
-            (self.kb_dir / "relationships").mkdir(parents=True, exist_ok=True)  # New directory for relationships
-            (self.kb_dir / "web_sources").mkdir(parents=True, exist_ok=True)  # New directory for web sources
+            self._patterns_dir.mkdir(parents=True, exist_ok=True)
+            self._rels_dir.mkdir(parents=True, exist_ok=True)  # New directory for relationships
+            self._web_dir.mkdir(parents=True, exist_ok=True)  # New directory for web sources
             
             # Initialize vector store if available
             if self.vector_store:
                 await self.vector_store.initialize()
+                await self._restore_vectors()
                 
-            # Load existing relationships and web sources
+            # Load existing patterns, relationships and web sources
+            await self._load_pattern_index()
+            if self.vector_store:
+                await self._load_embeddings()
             await self._load_relationships()
             await self._load_web_sources()
                 
             # Create initial patterns if none exist
-            if not list((self.kb_dir / "patterns").glob("*.json")):
+            if not self._pattern_index:
                 await self._create_initial_patterns()
                 
+            # Start persisting saves in the background
+            self._writer_task = asyncio.create_task(self._run_writer())
+            self._flusher_task = asyncio.create_task(self._run_flusher())
+                
             # Update state
             self.config.set_state("kb_initialized", True)
             self.initialized = True
         except Exception as e:
-            import traceback
-            print(f"Error initializing knowledge base: {str(e)}\n{traceback.format_exc()}")
+            # exc_info leaves traceback formatting to handlers that emit it
+            logger.error("Error initializing knowledge base: %s", e, exc_info=True)
             self.config.set_state("kb_initialized", False)
             self.config.set_state("kb_error", str(e))
             raise RuntimeError(f"Failed to initialize knowledge base: {str(e)}")
     
+    async def _load_pattern_index(self):
+        """Index the filterable metadata of existing patterns."""
+        paths = list(_iter_json_files(self._patterns_dir))
+        for file_path, data in zip(paths, await self._read_records(paths)):
+            try:
+                if isinstance(data, Exception):
+                    raise data
+                record = orjson.loads(data)
+                self._pattern_index[UUID(record["id"])] = {
+                    "type": PatternType(record["type"]),
+                    "confidence": PatternConfidence(record["confidence"]),
+                    "tags": frozenset(_intern_all(record.get("tags")) or ()),
+                    "created_at": datetime.fromisoformat(record["created_at"]),
+                }
+            except Exception as e:
+                print(f"Error indexing pattern from {file_path}: {e}")
+    
+    async def _load_embeddings(self):
+        """Load persisted embeddings of indexed patterns for local search."""
+        pattern_ids = list(self._pattern_index)
+        paths = [self._patterns_dir / f"{i}{EMBEDDING_SUFFIX}" for i in pattern_ids]
+        for pattern_id, data in zip(pattern_ids, await self._read_records(paths)):
+            if data is None or isinstance(data, Exception):
+                continue
+            embedding = np.frombuffer(data, dtype=EMBEDDING_DTYPE)
+            if len(embedding) == self.vector_store.vector_size:
+                self._embeddings[pattern_id] = embedding.astype(np.float32)
+        self._matrix = None
+    
+    def _index_pattern(self, pattern: Pattern) -> None:
+        """Record the filterable metadata of a pattern."""
+        self._pattern_index[pattern.id] = {
+            "type": pattern.type,
+            "confidence": pattern.confidence,
+            "tags": frozenset(_intern_all(pattern.tags) or ()),
+            "created_at": pattern.created_at,
+        }
+    
     async def _load_relationships(self):
         """Load existing file relationships."""
-        relationships_dir = self.kb_dir / "relationships"
-        if relationships_dir.exists():
-            for file_path in relationships_dir.glob("*.json"):
+        if self._rels_dir.exists():
+            paths = list(_iter_json_files(self._rels_dir))
+            stale_paths = []
+            relationships = await self._parse_in_threads(
+                await self._read_records(paths), _construct_relationship
+            )
+            for file_path, relationship in zip(paths, relationships):
                 try:
-                    with open(file_path) as f:
-                        data = json.load(f)
-                        relationship = FileRelationship(**data)
-                        key = f"{relationship.source_file}:{relationship.target_file}"
-                        self.file_relationships[key] = relationship
+                    if isinstance(relationship, Exception):
+                        raise relationship
+                    # File paths and relationship types repeat across many records
+                    relationship.source_file = sys.intern(relationship.source_file)
+                    relationship.target_file = sys.intern(relationship.target_file)
+                    relationship.relationship_type = sys.intern(relationship.relationship_type)
+                    key = f"{relationship.source_file}:{relationship.target_file}"
+                    if file_path.name != _stable_filename(key):
+                        stale_paths.append(file_path)
+                    existing = self.file_relationships.get(key)
+                    if existing is None or relationship.updated_at >= existing.updated_at:
+                        self._index_relationship(key, relationship)
                 except Exception as e:
                     print(f"Error loading relationship from {file_path}: {e}")
+                    
+            # Migrate files saved under the old per-process hash() names
+            if stale_paths:
+                for relationship in self.file_relationships.values():
+                    await self._save_relationship(relationship)
+                for file_path in stale_paths:
+                    await self._enqueue_write(file_path, None)
     
     async def _load_web_sources(self):
         """Load existing web sources."""
-        web_sources_dir = self.kb_dir / "web_sources"
-        if web_sources_dir.exists():
-            for file_path in web_sources_dir.glob("*.json"):
+        if self._web_dir.exists():
+            paths = list(_iter_json_files(self._web_dir))
+            stale_paths = []
+            sources = await self._parse_in_threads(
+                await self._read_records(paths), _construct_web_source
+            )
+            for file_path, source in zip(paths, sources):
                 try:
-                    with open(file_path) as f:
-                        data = json.load(f)
-                        source = WebSource(**data)
-                        self.web_sources[source.url] = source
+                    if isinstance(source, Exception):
+                        raise source
+                    source.content_type = sys.intern(source.content_type)
+                    source.tags = _intern_all(source.tags)
+                    if file_path.name != _stable_filename(source.url):
+                        stale_paths.append(file_path)
+                    existing = self.web_sources.get(source.url)
+                    if existing is None or source.last_fetched >= existing.last_fetched:
+                        self._index_web_source(source)
                 except Exception as e:
                     print(f"Error loading web source from {file_path}: {e}")
+                    
+            # Migrate files saved under the old per-process hash() names
+            if stale_paths:
+                for source in self.web_sources.values():
+                    await self._save_web_source(source)
+                for file_path in stale_paths:
+                    await self._enqueue_write(file_path, None)
+    
+    async def _restore_vectors(self):
+        """Re-seed an empty vector store from persisted pattern embeddings.
+        
+        Lets a rebuilt or replaced Qdrant collection be repopulated without
+        running the embedding model again.
+        """
+        try:
+            if await self.vector_store.count() > 0:
+                return
+        except Exception as e:
+            print(f"Warning: Could not check vector store contents: {e}")
+            return
+            
+        # Read embeddings first, then only the patterns that have a usable one
+        json_paths = list(_iter_json_files(self._patterns_dir))
+        embedding_paths = [p.with_suffix(EMBEDDING_SUFFIX) for p in json_paths]
+        restorable = []
+        for json_path, data in zip(json_paths, await self._read_records(embedding_paths)):
+            if data is None:
+                continue
+            if isinstance(data, Exception):
+                print(f"Error loading embedding for {json_path}: {data}")
+                continue
+            embedding = np.frombuffer(data, dtype=EMBEDDING_DTYPE)
+            if len(embedding) != self.vector_store.vector_size:
+                # Produced by a different embedding model
+                continue
+            restorable.append((json_path, embedding))
+            
+        paths = [json_path for json_path, _ in restorable]
+        patterns = await self._parse_in_threads(
+            await self._read_records(paths), _construct_pattern
+        )
+        points = []
+        for (json_path, embedding), pattern in zip(restorable, patterns):
+            if isinstance(pattern, Exception):
+                print(f"Error loading pattern from {json_path}: {pattern}")
+                continue
+            points.append({
+                "id": str(pattern.id),
+                "title": pattern.name,
+                "description": pattern.description,
+                "pattern_type": _PATTERN_TYPE_VALUES[pattern.type],
+                "tags": pattern.tags or [],
+                "embedding": embedding.astype(np.float32).tolist()
+            })
+            
+        try:
+            for i in range(0, len(points), RESTORE_BATCH_SIZE):
+                await self.vector_store.store_patterns(points[i:i + RESTORE_BATCH_SIZE])
+        except Exception as e:
+            print(f"Warning: Failed to restore pattern vectors: {e}")
     
     async def _create_initial_patterns(self):
         """Create initial patterns for testing."""
-        await self.add_pattern(
-            name="Basic Function",
-            type=PatternType.CODE,
-            description="A simple function that performs a calculation",
-            content="def calculate(x, y):\n    return x + y",
-            confidence=PatternConfidence.HIGH,
-            tags=["function", "basic"]
-        )
+        await self.add_patterns_bulk([
+            {
+                "name": "Basic Function",
+                "type": PatternType.CODE,
+                "description": "A simple function that performs a calculation",
+                "content": "def calculate(x, y):\n    return x + y",
+                "confidence": PatternConfidence.HIGH,
+                "tags": ["function", "basic"]
+            }
+        ])
     
     async def cleanup(self):
         """Clean up knowledge base components."""
@@ -167,6 +516,11 @@ class KnowledgeBase:
             return
             
         try:
+            try:
+                # Hand pending changes to the writer before it drains
+                await self._stop_flusher()
+            finally:
+                await self._stop_writer()
             if self.vector_store:
                 await self.vector_store.cleanup()
         except Exception as e:
@@ -187,53 +541,82 @@ class KnowledgeBase:
         examples: Optional[List[str]] = None,
         related_patterns: Optional[List[UUID]] = None
     ) -> Pattern:
-        """Add a new pattern."""
-        now = datetime.utcnow()
-        pattern = Pattern(
-            id=uuid4(),
-            name=name,
-            type=type,
-            description=description,
-            content=content,
-            confidence=confidence,
-            tags=tags,
-            metadata=metadata,
-            examples=examples,
-            related_patterns=related_patterns,
-            created_at=now,
-            updated_at=now
-        )
+        """Add a new pattern.
         
-        # Store pattern vector if vector store is available
-        if self.vector_store:
-            # Generate embedding for the pattern
-            combined_text = f"{pattern.name}\n{pattern.description}\n{pattern.content}"
-            try:
-                embedding = await self.vector_store.embedder.embed(combined_text)
-                await self.vector_store.store_pattern(
-                    id=str(pattern.id),
-                    title=pattern.name,
-                    description=pattern.description,
-                    pattern_type=pattern.type.value,
-                    tags=pattern.tags or [],
-                    embedding=embedding
-                )
-            except Exception as e:
-                print(f"Warning: Failed to store pattern vector: {e}")
+        The pattern can be read back as soon as this returns, but its file
+        is written by the background writer, so a crash before the write
+        lands loses it. cleanup() waits for all queued writes.
+        """
+        patterns = await self.add_patterns_bulk([{
+            "name": name,
+            "type": type,
+            "description": description,
+            "content": content,
+            "confidence": confidence,
+            "tags": tags,
+            "metadata": metadata,
+            "examples": examples,
+            "related_patterns": related_patterns
+        }])
+        return patterns[0]
+    
+    async def add_patterns_bulk(self, specs: List[Dict[str, Any]]) -> List[Pattern]:
+        """Add several patterns at once.
         
-        # Save pattern to file
-        await self._save_pattern(pattern)
-        return pattern
+        Each spec holds the keyword arguments accepted by add_pattern. All
+        patterns are embedded in one batch and upserted to the vector store
+        together, rather than one round trip per pattern. Files are written
+        in the background, as for add_pattern.
+        """
+        now = datetime.utcnow()
+        patterns = [
+            Pattern(id=uuid4(), created_at=now, updated_at=now, **spec)
+            for spec in specs
+        ]
+        if not patterns:
+            return []
+        
+        # Store the pattern vectors and files independently of each other
+        await asyncio.gather(
+            self._store_pattern_vectors(patterns),
+            *(self._save_pattern(pattern) for pattern in patterns)
+        )
+        return patterns
+    
+    async def _store_pattern_vectors(self, patterns: List[Pattern]) -> None:
+        """Embed new patterns and store their vectors, if a vector store is available."""
+        if not self.vector_store:
+            return
+            
+        texts = [_pattern_embed_text(pattern) for pattern in patterns]
+        try:
+            embeddings = await self.vector_store.embedder.embed_batch(texts)
+            await asyncio.gather(*(
+                self._save_embedding(pattern.id, embedding)
+                for pattern, embedding in zip(patterns, embeddings)
+            ))
+            await self.vector_store.store_patterns([
+                {
+                    "id": str(pattern.id),
+                    "title": pattern.name,
+                    "description": pattern.description,
+                    "pattern_type": _PATTERN_TYPE_VALUES[pattern.type],
+                    "tags": pattern.tags or [],
+                    "embedding": embedding
+                }
+                for pattern, embedding in zip(patterns, embeddings)
+            ])
+        except Exception as e:
+            print(f"Warning: Failed to store pattern vectors: {e}")
     
     async def get_pattern(self, pattern_id: UUID) -> Optional[Pattern]:
         """Get pattern by ID."""
-        pattern_path = self.kb_dir / "patterns" / f"{pattern_id}.json"
-        if not pattern_path.exists():
+        pattern_path = self._patterns_dir / f"{pattern_id}.json"
+        data = self._read_record(pattern_path)
+        if data is None:
             return None
             
-        with open(pattern_path) as f:
-            data = json.load(f)
-            return Pattern(**data)
+        return _construct_pattern(orjson.loads(data))
     
     async def update_pattern(
         self,
@@ -246,10 +629,15 @@ class KnowledgeBase:
         examples: Optional[List[str]] = None,
         related_patterns: Optional[List[UUID]] = None
     ) -> Optional[Pattern]:
-        """Update pattern details."""
+        """Update pattern details.
+        
+        The updated file is written in the background, as for add_pattern.
+        """
         pattern = await self.get_pattern(pattern_id)
         if not pattern:
             return None
+        old_text = _pattern_embed_text(pattern)
+        old_tags = pattern.tags
             
         if description:
             pattern.description = description
@@ -268,17 +656,18 @@ class KnowledgeBase:
             
         pattern.updated_at = datetime.utcnow()
         
-        # Update vector store if available
-        if self.vector_store:
+        # Update vector store if available and the vector or its payload changed
+        text = _pattern_embed_text(pattern)
+        if self.vector_store and (text != old_text or pattern.tags != old_tags):
             # Generate embedding for the updated pattern
-            combined_text = f"{pattern.name}\n{pattern.description}\n{pattern.content}"
             try:
-                embedding = await self.vector_store.embedder.embed(combined_text)
+                embedding = await self.vector_store.embedder.embed(text)
+                await self._save_embedding(pattern.id, embedding)
                 await self.vector_store.update_pattern(
                     id=str(pattern.id),
                     title=pattern.name,
                     description=pattern.description,
-                    pattern_type=pattern.type.value,
+                    pattern_type=_PATTERN_TYPE_VALUES[pattern.type],
                     tags=pattern.tags or [],
                     embedding=embedding
                 )
@@ -297,7 +686,8 @@ class KnowledgeBase:
         limit: int = 5
     ) -> List[SearchResult]:
         """Find similar patterns using vector similarity search."""
-        if not self.vector_store:
+        # Nothing to match against, so skip embedding the query
+        if not self.vector_store or not self._pattern_index:
             return []
             
         # Build filter conditions
@@ -311,17 +701,22 @@ class KnowledgeBase:
             
         # Search vectors with fallback on error
         try:
-            results = await self.vector_store.search(
-                text=query,
-                filter_conditions=filter_conditions,
-                limit=limit
-            )
+            embedding = await self._embed_query(query)
+            if self._can_search_locally():
+                results = self._search_local(embedding, pattern_type, confidence, tags, limit)
+            else:
+                results = await self.vector_store.search_by_vector(
+                    embedding,
+                    filter_conditions=filter_conditions,
+                    limit=limit,
+                    text=query
+                )
         except Exception as e:
             print(f"Warning: Semantic search failed ({e}), falling back to file-based search")
-            file_patterns = await self.list_patterns(pattern_type, confidence, tags)
+            file_patterns = await self.list_patterns(pattern_type, confidence, tags, limit=limit)
             return [
                 SearchResult(pattern=p, similarity_score=0.0)
-                for p in file_patterns[:limit]
+                for p in file_patterns
             ]
         
         # Load full patterns
@@ -329,33 +724,7 @@ class KnowledgeBase:
         for result in results:
             try:
                 # Handle different ID formats from Qdrant client
-                pattern_id = None
-                if hasattr(result, 'id'):
-                    # Try to convert the ID to UUID, handling different formats
-                    id_str = str(result.id)
-                    # Check if it's a valid UUID format
-                    if '-' in id_str and len(id_str.replace('-', '')) == 32:
-                        pattern_id = UUID(id_str)
-                    else:
-                        # Try to extract a UUID from the ID
-                        # Look for UUID patterns like xxxxxxxx-xxxx-xxxx-xxxx-xxxxxxxxxxxx
-                        import re
-                        uuid_match = re.search(r'([a-f0-9]{8}-[a-f0-9]{4}-[a-f0-9]{4}-[a-f0-9]{4}-[a-f0-9]{12})', id_str, re.IGNORECASE)
-                        if uuid_match:
-                            pattern_id = UUID(uuid_match.group(1))
-                else:
-                    # Handle tuple results from newer Qdrant client
-                    # Tuple format is typically (id, score, payload)
-                    if isinstance(result, tuple) and len(result) >= 1:
-                        id_str = str(result[0])
-                        # Same UUID validation as above
-                        if '-' in id_str and len(id_str.replace('-', '')) == 32:
-                            pattern_id = UUID(id_str)
-                        else:
-                            import re
-                            uuid_match = re.search(r'([a-f0-9]{8}-[a-f0-9]{4}-[a-f0-9]{4}-[a-f0-9]{4}-[a-f0-9]{12})', id_str, re.IGNORECASE)
-                            if uuid_match:
-                                pattern_id = UUID(uuid_match.group(1))
+                pattern_id, score = _extract_id_and_score(result)
                 
                 # Skip if we couldn't extract a valid UUID
                 if pattern_id is None:
@@ -365,11 +734,6 @@ class KnowledgeBase:
                 # Get the pattern using the UUID
                 pattern = await self.get_pattern(pattern_id)
                 if pattern:
-                    # Get score from result
-                    score = result.score if hasattr(result, 'score') else (
-                        result[1] if isinstance(result, tuple) and len(result) >= 2 else 0.0
-                    )
-                    
                     search_results.append(SearchResult(
                         pattern=pattern,
                         similarity_score=score
@@ -379,30 +743,96 @@ class KnowledgeBase:
                 
         return search_results
     
+    def _can_search_locally(self) -> bool:
+        """Whether every pattern has a known embedding and the set is small."""
+        return (
+            0 < len(self._embeddings) <= LOCAL_SEARCH_MAX_PATTERNS
+            and len(self._embeddings) == len(self._pattern_index)
+        )
+    
+    def _search_local(
+        self,
+        embedding: List[float],
+        pattern_type: Optional[PatternType],
+        confidence: Optional[PatternConfidence],
+        tags: Optional[List[str]],
+        limit: int
+    ) -> List[Tuple[UUID, float]]:
+        """Rank patterns by cosine similarity with one matrix-vector product."""
+        if self._matrix is None:
+            self._matrix_ids = list(self._embeddings)
+            matrix = np.stack([self._embeddings[i] for i in self._matrix_ids])
+            self._matrix = matrix / np.maximum(np.linalg.norm(matrix, axis=1, keepdims=True), _MIN_NORM)
+            
+        query = np.asarray(embedding, dtype=np.float32)
+        scores = self._matrix @ (query / max(float(np.linalg.norm(query)), _MIN_NORM))
+        
+        tag_set = frozenset(tags or ())
+        if pattern_type or confidence or tag_set:
+            keep = np.fromiter(
+                (
+                    _matches_filters(self._pattern_index.get(i), pattern_type, confidence, tag_set)
+                    for i in self._matrix_ids
+                ),
+                dtype=bool,
+                count=len(self._matrix_ids)
+            )
+            scores = np.where(keep, scores, -np.inf)
+            k = min(limit, int(keep.sum()))
+        else:
+            k = min(limit, len(scores))
+        if k <= 0:
+            return []
+            
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(self._matrix_ids[i], float(scores[i])) for i in top]
+    
+    async def _embed_query(self, query: str) -> List[float]:
+        """Embed a search query, reusing the embedding of a repeated query."""
+        key = hashlib.blake2b(query.encode(), digest_size=16).hexdigest()
+        embedding = self._query_embed_cache.get(key)
+        if embedding is None:
+            embedding = await self.vector_store.embedder.embed(query)
+            self._query_embed_cache.put(key, embedding)
+        return embedding
+    
     async def list_patterns(
         self,
         pattern_type: Optional[PatternType] = None,
         confidence: Optional[PatternConfidence] = None,
-        tags: Optional[List[str]] = None
+        tags: Optional[List[str]] = None,
+        limit: Optional[int] = None
     ) -> List[Pattern]:
-        """List all patterns, optionally filtered."""
+        """List all patterns, optionally filtered, oldest first.
+        
+        When limit is given, only the oldest limit matches are loaded.
+        """
+        # Apply filters against the index, then load only the matches
+        tag_set = frozenset(tags or ())
+        candidates = [
+            (meta["created_at"], pattern_id)
+            for pattern_id, meta in self._pattern_index.items()
+            if _matches_filters(meta, pattern_type, confidence, tag_set)
+        ]
+        if limit is None:
+            candidates.sort(key=lambda x: x[0])
+        else:
+            candidates = heapq.nsmallest(limit, candidates, key=lambda x: x[0])
+        
+        paths = [self._patterns_dir / f"{pattern_id}.json" for _, pattern_id in candidates]
+        
         patterns = []
-        for path in (self.kb_dir / "patterns").glob("*.json"):
-            with open(path) as f:
-                data = json.load(f)
-                pattern = Pattern(**data)
+        for data in await self._read_records(paths):
+            if data is None:
+                continue
+            if isinstance(data, Exception):
+                raise data
+            pattern = _construct_pattern(orjson.loads(data))
+            pattern.tags = _intern_all(pattern.tags)
+            patterns.append(pattern)
                 
-                # Apply filters
-                if pattern_type and pattern.type != pattern_type:
-                    continue
-                if confidence and pattern.confidence != confidence:
-                    continue
-                if tags and not all(tag in (pattern.tags or []) for tag in tags):
-                    continue
-                    
-                patterns.append(pattern)
-                
-        return sorted(patterns, key=lambda x: x.created_at)
+        return patterns
     
     async def analyze_code(self, code: str, context: Optional[Dict[str, str]] = None) -> Dict:
         """Analyze code for patterns and insights.
@@ -431,7 +861,7 @@ class KnowledgeBase:
             })
             
         return {
-            "patterns": [p.pattern.dict() for p in patterns],
+            "patterns": [p.pattern.model_dump(mode="json") for p in patterns],
             "insights": insights,
             "summary": {
                 "total_patterns": len(patterns),
@@ -442,11 +872,132 @@ class KnowledgeBase:
     
     async def _save_pattern(self, pattern: Pattern) -> None:
         """Save pattern to file."""
-        pattern_dir = self.kb_dir / "patterns"
-        pattern_dir.mkdir(parents=True, exist_ok=True)
-        pattern_path = pattern_dir / f"{pattern.id}.json"
-        with open(pattern_path, "w") as f:
-            json.dump(pattern.model_dump(), f, indent=2, default=str)
+        self._patterns_dir.mkdir(parents=True, exist_ok=True)
+        pattern_path = self._patterns_dir / f"{pattern.id}.json"
+        self._index_pattern(pattern)
+        # Compact encoding: no indentation, UUIDs/datetimes serialized natively
+        await self._enqueue_write(pattern_path, pattern.model_dump_json().encode())
+
+    async def _save_embedding(self, pattern_id: UUID, embedding: List[float]) -> None:
+        """Save a pattern embedding next to the pattern file."""
+        embedding_path = self._patterns_dir / f"{pattern_id}{EMBEDDING_SUFFIX}"
+        self._embeddings[pattern_id] = np.asarray(embedding, dtype=np.float32)
+        self._matrix = None
+        payload = np.asarray(embedding, dtype=EMBEDDING_DTYPE).tobytes()
+        await self._enqueue_write(embedding_path, payload)
+
+    async def _enqueue_write(self, path: Path, payload: Optional[bytes]) -> None:
+        """Queue a write (or a delete, when payload is None) for the background writer.
+        
+        Repeated saves of the same path before it is flushed are coalesced so
+        only the latest payload is written.
+        """
+        if self._writer_task is None:
+            # Writer not running (before initialize or after cleanup)
+            await asyncio.to_thread(_write_file, path, payload)
+            return
+            
+        already_queued = path in self._pending_saves
+        self._pending_saves[path] = payload
+        if not already_queued:
+            await self._save_queue.put(path)
+
+    def _read_record(self, path: Path) -> Optional[bytes]:
+        """Read a stored record, preferring writes that are still queued."""
+        if path in self._pending_saves:
+            return self._pending_saves[path]
+        return _read_file(path)
+
+    async def _read_records(self, paths: Sequence[Path]) -> List:
+        """Read stored records concurrently off the event loop.
+        
+        Returns one entry per path: the record bytes, None for a missing or
+        deleted record, or the exception raised while reading it.
+        """
+        async def read(path: Path) -> Optional[bytes]:
+            if path in self._pending_saves:
+                return self._pending_saves[path]
+            return await asyncio.to_thread(_read_file, path)
+            
+        return await asyncio.gather(*(read(p) for p in paths), return_exceptions=True)
+
+    async def _parse_in_threads(
+        self,
+        blobs: Sequence[Any],
+        construct: Callable[[Dict[str, Any]], Any]
+    ) -> List[Any]:
+        """Parse records in chunks on worker threads, keeping their order."""
+        chunks = [blobs[i:i + LOAD_CHUNK_SIZE] for i in range(0, len(blobs), LOAD_CHUNK_SIZE)]
+        parsed = await asyncio.gather(*(
+            asyncio.to_thread(_parse_records, chunk, construct) for chunk in chunks
+        ))
+        return [record for chunk in parsed for record in chunk]
+
+    async def _run_writer(self) -> None:
+        """Persist queued records to disk off the request path."""
+        while True:
+            path = await self._save_queue.get()
+            try:
+                # Keep writing until no newer payload arrived during the write
+                while True:
+                    payload = self._pending_saves[path]
+                    await asyncio.to_thread(_write_file, path, payload)
+                    if self._pending_saves.get(path) is payload:
+                        del self._pending_saves[path]
+                        break
+            except Exception as e:
+                print(f"Warning: Failed to persist {path}: {e}")
+                self._pending_saves.pop(path, None)
+            finally:
+                self._save_queue.task_done()
+
+    async def _stop_writer(self) -> None:
+        """Flush queued records and stop the background writer."""
+        if self._writer_task is None:
+            return
+            
+        await self._save_queue.join()
+        self._writer_task.cancel()
+        try:
+            await self._writer_task
+        except asyncio.CancelledError:
+            pass
+        self._writer_task = None
+
+    async def _flush_dirty(self) -> None:
+        """Save relationships and web sources changed since the last flush."""
+        dirty_rels, self._dirty_rels = self._dirty_rels, set()
+        dirty_sources, self._dirty_sources = self._dirty_sources, set()
+        try:
+            await asyncio.gather(
+                *(self._save_relationship(self.file_relationships[key]) for key in dirty_rels),
+                *(self._save_web_source(self.web_sources[url]) for url in dirty_sources)
+            )
+        except BaseException:
+            # Keep the changes for the next flush; saving twice is harmless
+            self._dirty_rels |= dirty_rels
+            self._dirty_sources |= dirty_sources
+            raise
+
+    async def _run_flusher(self) -> None:
+        """Periodically flush changed relationships and web sources."""
+        while True:
+            await asyncio.sleep(FLUSH_INTERVAL)
+            try:
+                await self._flush_dirty()
+            except Exception as e:
+                print(f"Warning: Failed to flush knowledge base changes: {e}")
+
+    async def _stop_flusher(self) -> None:
+        """Stop the periodic flusher and flush any remaining changes."""
+        if self._flusher_task is not None:
+            self._flusher_task.cancel()
+            try:
+                await self._flusher_task
+            except asyncio.CancelledError:
+                pass
+            self._flusher_task = None
+        await self._flush_dirty()
 
     async def search_patterns(
         self,
@@ -464,7 +1015,13 @@ class KnowledgeBase:
         description: Optional[str] = None,
         metadata: Optional[Dict[str, str]] = None
     ) -> FileRelationship:
-        """Add a new file relationship."""
+        """Add a new file relationship.
+        
+        The relationship is visible at once but saved by the periodic
+        flusher, up to FLUSH_INTERVAL seconds later, and then written in the
+        background; a crash in between loses it. cleanup() saves every
+        pending change before returning.
+        """
         relationship = FileRelationship(
             source_file=source_file,
             target_file=target_file,
@@ -474,12 +1031,26 @@ class KnowledgeBase:
         )
         
         key = f"{source_file}:{target_file}"
-        self.file_relationships[key] = relationship
+        self._index_relationship(key, relationship)
         
-        # Save to disk
-        await self._save_relationship(relationship)
+        # Save to disk, batched with other changes when the flusher runs
+        if self._flusher_task is None:
+            await self._save_relationship(relationship)
+        else:
+            self._dirty_rels.add(key)
         return relationship
     
+    def _index_relationship(self, key: str, relationship: FileRelationship) -> None:
+        """Store relationship under key and record it in the file indexes."""
+        self.file_relationships[key] = relationship
+        self._by_source.setdefault(relationship.source_file, {})[key] = None
+        self._by_target.setdefault(relationship.target_file, {})[key] = None
+    
+    def _index_web_source(self, source: WebSource) -> None:
+        """Store source by URL and record its tag set."""
+        self.web_sources[source.url] = source
+        self._web_source_tags[source.url] = frozenset(source.tags or ())
+    
     async def add_web_source(
         self,
         url: str,
@@ -489,7 +1060,10 @@ class KnowledgeBase:
         metadata: Optional[Dict[str, str]] = None,
         tags: Optional[List[str]] = None
     ) -> WebSource:
-        """Add a new web source."""
+        """Add a new web source.
+        
+        Saved by the periodic flusher, as for add_file_relationship.
+        """
         source = WebSource(
             url=url,
             title=title,
@@ -499,10 +1073,13 @@ class KnowledgeBase:
             tags=tags
         )
         
-        self.web_sources[url] = source
+        self._index_web_source(source)
         
-        # Save to disk
-        await self._save_web_source(source)
+        # Save to disk, batched with other changes when the flusher runs
+        if self._flusher_task is None:
+            await self._save_web_source(source)
+        else:
+            self._dirty_sources.add(url)
         return source
     
     async def get_file_relationships(
@@ -511,13 +1088,22 @@ class KnowledgeBase:
         target_file: Optional[str] = None,
         relationship_type: Optional[str] = None
     ) -> List[FileRelationship]:
-        """Get file relationships, optionally filtered."""
-        relationships = list(self.file_relationships.values())
-        
-        if source_file:
-            relationships = [r for r in relationships if r.source_file == source_file]
-        if target_file:
-            relationships = [r for r in relationships if r.target_file == target_file]
+        """Get file relationships, optionally filtered, in insertion order."""
+        if source_file and target_file:
+            targets = self._by_target.get(target_file, {})
+            keys = [k for k in self._by_source.get(source_file, {}) if k in targets]
+        elif source_file:
+            keys = self._by_source.get(source_file, {})
+        elif target_file:
+            keys = self._by_target.get(target_file, {})
+        else:
+            keys = None
+            
+        if keys is None:
+            relationships = list(self.file_relationships.values())
+        else:
+            relationships = [self.file_relationships[key] for key in keys]
+            
         if relationship_type:
             relationships = [r for r in relationships if r.relationship_type == relationship_type]
             
@@ -534,43 +1120,59 @@ class KnowledgeBase:
         if content_type:
             sources = [s for s in sources if s.content_type == content_type]
         if tags:
-            sources = [s for s in sources if s.tags and all(tag in s.tags for tag in tags)]
+            tag_set = frozenset(tags)
+            sources = [s for s in sources if self._web_source_tags[s.url].issuperset(tag_set)]
             
         return sources
     
     async def _save_relationship(self, relationship: FileRelationship) -> None:
         """Save file relationship to disk."""
-        relationships_dir = self.kb_dir / "relationships"
-        relationships_dir.mkdir(parents=True, exist_ok=True)
+        self._rels_dir.mkdir(parents=True, exist_ok=True)
         
         key = f"{relationship.source_file}:{relationship.target_file}"
-        file_path = relationships_dir / f"{hash(key)}.json"
+        file_path = self._rels_dir / _stable_filename(key)
         
-        with open(file_path, "w") as f:
-            json.dump(relationship.model_dump(), f, indent=2, default=str)
+        await self._enqueue_write(file_path, relationship.model_dump_json().encode())
     
     async def _save_web_source(self, source: WebSource) -> None:
         """Save web source to disk."""
-        web_sources_dir = self.kb_dir / "web_sources"
-        web_sources_dir.mkdir(parents=True, exist_ok=True)
+        self._web_dir.mkdir(parents=True, exist_ok=True)
         
-        file_path = web_sources_dir / f"{hash(source.url)}.json"
+        file_path = self._web_dir / _stable_filename(source.url)
         
-        with open(file_path, "w") as f:
-            json.dump(source.model_dump(), f, indent=2, default=str)
+        await self._enqueue_write(file_path, source.model_dump_json().encode())
 
     async def delete_pattern(self, pattern_id: UUID) -> None:
-        """Delete a pattern by ID from knowledge base and vector store."""
-        # Delete from vector store if available
-        if self.vector_store:
-            try:
-                await self.vector_store.delete_pattern(str(pattern_id))
-            except Exception as e:
-                print(f"Warning: Failed to delete pattern vector: {e}")
-        # Delete pattern file
-        pattern_path = self.kb_dir / "patterns" / f"{pattern_id}.json"
-        if pattern_path.exists():
-            try:
-                pattern_path.unlink()
-            except Exception as e:
-                print(f"Warning: Failed to delete pattern file: {e}")
+        """Delete a pattern by ID from knowledge base and vector store.
+        
+        The files are removed in the background, as for add_pattern.
+        """
+        self._pattern_index.pop(pattern_id, None)
+        if self._embeddings.pop(pattern_id, None) is not None:
+            self._matrix = None
+        await asyncio.gather(
+            self._delete_pattern_vector(pattern_id),
+            self._delete_pattern_files(pattern_id)
+        )
+    
+    async def _delete_pattern_vector(self, pattern_id: UUID) -> None:
+        """Delete a pattern vector, if a vector store is available."""
+        if not self.vector_store:
+            return
+            
+        try:
+            await self.vector_store.delete_pattern(str(pattern_id))
+        except Exception as e:
+            print(f"Warning: Failed to delete pattern vector: {e}")
+    
+    async def _delete_pattern_files(self, pattern_id: UUID) -> None:
+        """Delete a pattern file and its embedding.
+        
+        Deletes are queued behind any pending write of the same file.
+        """
+        pattern_path = self._patterns_dir / f"{pattern_id}.json"
+        try:
+            await self._enqueue_write(pattern_path, None)
+            await self._enqueue_write(pattern_path.with_suffix(EMBEDDING_SUFFIX), None)
+        except Exception as e:
+            print(f"Warning: Failed to delete pattern file: {e}")
@@ -1,13 +1,27 @@
 """Metrics collection and monitoring module."""
 
-import json
+import mmap
+import os
+import shutil
 from datetime import datetime
 from enum import Enum
 from pathlib import Path
 from typing import Dict, List, Optional, Union
 
+import numpy as np
+import orjson
 from pydantic import BaseModel
 
+# Number of recent values kept in memory per metric; a series is trimmed
+# back to this size once it reaches twice as many values
+METRIC_HISTORY_SIZE = 10000
+
+# Initial number of values a metric series has room for
+METRIC_SERIES_CAPACITY = 64
+
+# Number of new values per metric buffered before appending them to disk
+METRIC_FLUSH_SIZE = 100
+
 class MetricType(str, Enum):
     """Metric type enumeration."""
     
@@ -25,6 +39,59 @@ class Metric(BaseModel):
     labels: Optional[Dict[str, str]] = None
     timestamp: datetime
 
+class MetricSeries:
+    """History of one metric, stored column-wise.
+    
+    Values and epoch seconds live in contiguous numpy arrays so window
+    lookups and summary statistics are vectorized.
+    """
+    
+    def __init__(self, capacity: int = METRIC_SERIES_CAPACITY):
+        """Initialize an empty series."""
+        self.values = np.empty(capacity, dtype=np.float64)
+        self.epochs = np.empty(capacity, dtype=np.float64)
+        self.types: List[MetricType] = []
+        self.labels: List[Optional[Dict[str, str]]] = []
+        self.timestamps: List[datetime] = []
+        self.size = 0
+    
+    def __len__(self) -> int:
+        """Return the number of values in the series."""
+        return self.size
+    
+    def append(self, metric: Metric) -> None:
+        """Append a metric value."""
+        if self.size == len(self.values):
+            self._make_room()
+        self.values[self.size] = metric.value
+        self.epochs[self.size] = metric.timestamp.timestamp()
+        self.types.append(metric.type)
+        self.labels.append(metric.labels)
+        self.timestamps.append(metric.timestamp)
+        self.size += 1
+    
+    def window(self, start_epoch: Optional[float] = None, end_epoch: Optional[float] = None) -> slice:
+        """Return the slice of values recorded within the given epoch range."""
+        epochs = self.epochs[:self.size]
+        start = 0 if start_epoch is None else int(np.searchsorted(epochs, start_epoch, side="left"))
+        end = self.size if end_epoch is None else int(np.searchsorted(epochs, end_epoch, side="right"))
+        return slice(start, end)
+    
+    def _make_room(self) -> None:
+        """Grow the arrays geometrically, or drop the oldest values at the cap."""
+        capacity = len(self.values)
+        if capacity >= 2 * METRIC_HISTORY_SIZE:
+            drop = self.size - METRIC_HISTORY_SIZE
+            self.values[:METRIC_HISTORY_SIZE] = self.values[drop:self.size]
+            self.epochs[:METRIC_HISTORY_SIZE] = self.epochs[drop:self.size]
+            del self.types[:drop], self.labels[:drop], self.timestamps[:drop]
+            self.size = METRIC_HISTORY_SIZE
+            return
+            
+        new_capacity = min(2 * capacity, 2 * METRIC_HISTORY_SIZE)
+        self.values = np.resize(self.values, new_capacity)
+        self.epochs = np.resize(self.epochs, new_capacity)
+
 class MetricsManager:
     """Manager for system metrics."""
     
@@ -34,7 +101,11 @@ class MetricsManager:
         self.enabled = config.metrics_enabled
         self.metrics_dir = config.docs_cache_dir / "metrics"
         self.metrics_dir.mkdir(parents=True, exist_ok=True)
-        self.metrics: Dict[str, List[Metric]] = {}
+        self.metrics: Dict[str, MetricSeries] = {}
+        # Metric files found at startup and not yet read into memory
+        self._metric_files: Dict[str, Path] = {}
+        # Values recorded since the last append to each metric's file
+        self._unsaved: Dict[str, List[Metric]] = {}
         self.initialized = False
     
     async def initialize(self):
@@ -46,17 +117,18 @@ class MetricsManager:
             if not self.enabled:
                 return
                 
-            # Load existing metrics
+            # Histories saved by older versions as one JSON array per
+            # metric are converted to NDJSON once
             for path in self.metrics_dir.glob("*.json"):
                 try:
-                    metric_name = path.stem
-                    with open(path) as f:
-                        data = json.load(f)
-                        self.metrics[metric_name] = [
-                            Metric(**metric) for metric in data
-                        ]
+                    self._convert_legacy_file(path)
                 except Exception as e:
-                    print(f"Error loading metric file {path}: {e}")
+                    print(f"Error converting metric file {path}: {e}")
+                    
+            # Register existing metrics; each is read on first access
+            self._metric_files = {
+                path.stem: path for path in self.metrics_dir.glob("*.ndjson")
+            }
                     
             self.initialized = True
         except Exception as e:
@@ -73,12 +145,13 @@ class MetricsManager:
             if not self.enabled:
                 return
                 
-            # Save all metrics
-            for name, metrics in self.metrics.items():
+            # Save metrics recorded since the last append
+            for name, metrics in self._unsaved.items():
                 try:
                     await self._save_metrics(name, metrics)
                 except Exception as e:
                     print(f"Error saving metrics for {name}: {e}")
+            self._unsaved.clear()
         except Exception as e:
             print(f"Error cleaning up metrics manager: {e}")
         finally:
@@ -90,14 +163,18 @@ class MetricsManager:
             return
             
         # Clear in-memory metrics
-        self.metrics = {}
+        self.metrics.clear()
+        self._metric_files.clear()
+        self._unsaved.clear()
         
-        # Remove all metric files
-        for path in self.metrics_dir.glob("*.json"):
-            try:
-                path.unlink()
-            except Exception as e:
-                print(f"Error removing metric file {path}: {e}")
+        # Remove all metric files by recreating the metrics directory
+        try:
+            shutil.rmtree(self.metrics_dir)
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"Error removing metrics directory {self.metrics_dir}: {e}")
+        self.metrics_dir.mkdir(parents=True, exist_ok=True)
     
     async def record_metric(
         self,
@@ -110,22 +187,27 @@ class MetricsManager:
         if not self.enabled:
             return
             
-        metric = Metric(
+        # Arguments are already typed, so skip model validation
+        metric = Metric.model_construct(
             name=name,
-            type=type,
+            type=MetricType(type),
             value=value,
             labels=labels,
             timestamp=datetime.utcnow()
         )
         
-        if name not in self.metrics:
-            self.metrics[name] = []
-        self.metrics[name].append(metric)
+        self._ensure_loaded(name)
+        series = self.metrics.get(name)
+        if series is None:
+            series = self.metrics[name] = MetricSeries()
+        series.append(metric)
+        unsaved = self._unsaved.setdefault(name, [])
+        unsaved.append(metric)
         
-        # Save metrics periodically
-        if len(self.metrics[name]) >= 100:
-            await self._save_metrics(name, self.metrics[name])
-            self.metrics[name] = []
+        # Append new values to disk periodically
+        if len(unsaved) >= METRIC_FLUSH_SIZE:
+            await self._save_metrics(name, unsaved)
+            self._unsaved[name] = []
     
     async def get_metrics(
         self,
@@ -138,21 +220,30 @@ class MetricsManager:
             return {}
             
         result = {}
-        metric_names = names or list(self.metrics.keys())
+        metric_names = names or [*self.metrics, *self._metric_files]
         
         for name in metric_names:
-            if name not in self.metrics:
+            self._ensure_loaded(name)
+            series = self.metrics.get(name)
+            if series is None:
                 continue
-                
-            metrics = self.metrics[name]
             
             # Apply time filters
-            if start_time:
-                metrics = [m for m in metrics if m.timestamp >= start_time]
-            if end_time:
-                metrics = [m for m in metrics if m.timestamp <= end_time]
+            window = series.window(
+                start_time.timestamp() if start_time else None,
+                end_time.timestamp() if end_time else None
+            )
                 
-            result[name] = [metric.model_dump() for metric in metrics]
+            result[name] = [
+                {
+                    "name": name,
+                    "type": series.types[i],
+                    "value": float(series.values[i]),
+                    "labels": series.labels[i],
+                    "timestamp": series.timestamps[i]
+                }
+                for i in range(window.start, window.stop)
+            ]
             
         return result
     
@@ -162,39 +253,77 @@ class MetricsManager:
         window_minutes: int = 60
     ) -> Optional[Dict]:
         """Get summary statistics for a metric."""
-        if not self.enabled or name not in self.metrics:
+        if not self.enabled:
             return None
-            
-        metrics = self.metrics[name]
-        if not metrics:
+        self._ensure_loaded(name)
+        series = self.metrics.get(name)
+        if not series:
             return None
             
         # Filter metrics within time window
         cutoff = datetime.utcnow().timestamp() - (window_minutes * 60)
-        recent_metrics = [
-            m for m in metrics
-            if m.timestamp.timestamp() >= cutoff
-        ]
+        values = series.values[series.window(cutoff)]
         
-        if not recent_metrics:
+        if not len(values):
             return None
             
-        values = [m.value for m in recent_metrics]
         return {
             "count": len(values),
-            "min": min(values),
-            "max": max(values),
-            "avg": sum(values) / len(values),
-            "last": values[-1]
+            "min": float(values.min()),
+            "max": float(values.max()),
+            "avg": float(values.mean()),
+            "last": float(values[-1])
         }
     
+    def _ensure_loaded(self, name: str) -> None:
+        """Read a metric's history from disk if it has not been read yet."""
+        path = self._metric_files.pop(name, None)
+        if path is None:
+            return
+            
+        series = MetricSeries()
+        try:
+            with open(path, "rb") as f:
+                if path.stat().st_size:
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                        for line in iter(mm.readline, b""):
+                            if line.strip():
+                                series.append(Metric(**orjson.loads(line)))
+        except Exception as e:
+            print(f"Error loading metric file {path}: {e}")
+        self.metrics[name] = series
+    
+    def _convert_legacy_file(self, path: Path) -> None:
+        """Rewrite a metric history saved as a JSON array as NDJSON.
+        
+        The converted records go before any already in the metric's NDJSON
+        file, and the JSON file is removed.
+        """
+        records = orjson.loads(path.read_bytes())
+        ndjson_path = path.with_suffix(".ndjson")
+        payload = b"".join(orjson.dumps(record) + b"\n" for record in records)
+        if ndjson_path.exists():
+            payload += ndjson_path.read_bytes()
+        tmp_path = ndjson_path.with_name(f"{ndjson_path.name}.tmp")
+        tmp_path.write_bytes(payload)
+        os.replace(tmp_path, ndjson_path)
+        path.unlink()
+    
     async def _save_metrics(self, name: str, metrics: List[Metric]) -> None:
-        """Save metrics to file."""
-        metric_path = self.metrics_dir / f"{name}.json"
-        with open(metric_path, "w") as f:
-            json.dump(
-                [metric.model_dump() for metric in metrics],
-                f,
-                indent=2,
-                default=str
-            )
+        """Append metrics to the metric's file, one JSON record per line."""
+        if not metrics:
+            return
+            
+        metric_path = self.metrics_dir / f"{name}.ndjson"
+        payload = b"".join(
+            orjson.dumps({
+                "name": metric.name,
+                "type": metric.type,
+                "value": metric.value,
+                "labels": metric.labels,
+                "timestamp": metric.timestamp
+            }) + b"\n"
+            for metric in metrics
+        )
+        with open(metric_path, "ab") as f:
+            f.write(payload)
@@ -2,10 +2,11 @@
 
 from datetime import datetime
 from enum import Enum
-from typing import Dict, List, Optional
+from string import Formatter
+from typing import Dict, FrozenSet, List, Optional, Tuple
 from uuid import UUID, uuid4
 
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 
 class PromptType(str, Enum):
     """Prompt type enumeration."""
@@ -17,7 +18,13 @@ class PromptType(str, Enum):
     ADR = "adr"
 
 class PromptTemplate(BaseModel):
-    """Prompt template model."""
+    """Prompt template model.
+    
+    Templates are immutable; updates replace the stored instance, so the
+    parsed form kept by PromptManager cannot drift from the template text.
+    """
+    
+    model_config = ConfigDict(frozen=True)
     
     id: UUID
     name: str
@@ -30,6 +37,19 @@ class PromptTemplate(BaseModel):
     updated_at: datetime
     version: Optional[str] = None
 
+def _compile_template(template: str) -> Optional[List[Tuple[str, Optional[str]]]]:
+    """Split a template into (literal text, variable name) pairs.
+    
+    Returns None for templates using positional fields, attribute or index
+    lookups, conversions or format specs, which are left to str.format.
+    """
+    parts = []
+    for literal, field, spec, conversion in Formatter().parse(template):
+        if field is not None and (not field.isidentifier() or spec or conversion):
+            return None
+        parts.append((literal, field))
+    return parts
+
 class PromptManager:
     """Manager for prompt templates and generation."""
     
@@ -37,6 +57,10 @@ class PromptManager:
         """Initialize prompt manager."""
         self.config = config
         self.templates: Dict[str, PromptTemplate] = {}
+        # Parsed form of each template, so rendering skips format parsing
+        self._compiled: Dict[str, Optional[List[Tuple[str, Optional[str]]]]] = {}
+        # Required variable names of each template
+        self._variable_sets: Dict[str, FrozenSet[str]] = {}
         self._load_default_templates()
     
     def _load_default_templates(self):
@@ -198,6 +222,8 @@ Provide:
         )
         
         self.templates[name] = template
+        self._compiled[name] = _compile_template(template.template)
+        self._variable_sets[name] = frozenset(variables)
         return template
     
     def get_template(self, name: str) -> Optional[PromptTemplate]:
@@ -225,12 +251,21 @@ Provide:
             return None
             
         # Validate variables
-        missing = [v for v in template.variables if v not in variables]
+        missing = self._variable_sets[template_name] - variables.keys()
         if missing:
-            raise ValueError(f"Missing required variables: {', '.join(missing)}")
+            names = [v for v in template.variables if v in missing]
+            raise ValueError(f"Missing required variables: {', '.join(names)}")
             
         try:
-            return template.template.format(**variables)
+            parts = self._compiled.get(template_name)
+            if parts is None:
+                return template.template.format(**variables)
+            rendered = []
+            for literal, field in parts:
+                rendered.append(literal)
+                if field is not None:
+                    rendered.append(str(variables[field]))
+            return "".join(rendered)
         except KeyError as e:
             raise ValueError(f"Invalid variable: {e}")
         except Exception as e:
@@ -249,14 +284,18 @@ Provide:
         if not tmpl:
             return None
             
+        updates = {"updated_at": datetime.utcnow()}
         if template:
-            tmpl.template = template
+            updates["template"] = template
         if description:
-            tmpl.description = description
+            updates["description"] = description
         if examples:
-            tmpl.examples = examples
+            updates["examples"] = examples
         if version:
-            tmpl.version = version
+            updates["version"] = version
             
-        tmpl.updated_at = datetime.utcnow()
+        tmpl = tmpl.model_copy(update=updates)
+        self.templates[name] = tmpl
+        if template:
+            self._compiled[name] = _compile_template(template)
         return tmpl
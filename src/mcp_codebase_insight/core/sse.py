@@ -2,39 +2,219 @@
 
 import asyncio
 import logging
-import json
-from typing import Any, Callable, Dict, List, Optional, Tuple
+import time
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Callable, Deque, Dict, List, Mapping, Optional, Tuple
 from datetime import datetime
+from types import MappingProxyType
 from starlette.applications import Starlette
 from starlette.routing import Mount, Route
 from starlette.requests import Request
 from starlette.responses import Response, JSONResponse, RedirectResponse, StreamingResponse
-import uuid
-from anyio.streams.memory import MemoryObjectReceiveStream, MemoryObjectSendStream
+from collections import deque
+from functools import lru_cache
+import orjson
+import pydantic_core
 from starlette.middleware.cors import CORSMiddleware
 
 from mcp.server.fastmcp import FastMCP
 from mcp.server.sse import SseServerTransport
+from .cache import MemoryCache
 from ..utils.logger import get_logger
 
 logger = get_logger(__name__)
 
-async def send_heartbeats(queue: asyncio.Queue, interval: int = 30):
-    """Send periodic heartbeat messages to keep the connection alive.
+# Number of vector search queries whose results are cached by exact text
+SEARCH_CACHE_SIZE = 512
+
+# Seconds a cached vector search response is reused; the store's write
+# generation only tracks writes made through this process, so this bounds
+# how stale results can get when another process writes to the collection
+SEARCH_CACHE_TTL = 30.0
+
+# Maximum number of messages buffered for one SSE connection, a power of
+# two; once a slow client's buffer is full its oldest messages are dropped
+SSE_QUEUE_SIZE = 1024
+
+# Response headers for SSE connections
+_SSE_HEADERS = MappingProxyType({
+    "Cache-Control": "no-cache",
+    "Connection": "keep-alive",
+    "X-Accel-Buffering": "no",
+    "Access-Control-Allow-Origin": "*",  # Allow CORS
+    "Access-Control-Allow-Headers": "Content-Type",
+    "Access-Control-Allow-Methods": "GET, POST"
+})
+
+# The same headers encoded for ASGI, with the SSE content type
+_SSE_RAW_HEADERS = (
+    (b"content-type", b"text/event-stream; charset=utf-8"),
+    *((name.lower().encode("latin-1"), value.encode("latin-1")) for name, value in _SSE_HEADERS.items()),
+)
+
+# Seconds an encoded heartbeat event is reused before its timestamp is
+# refreshed
+HEARTBEAT_FRAME_TTL = 1.0
+
+# Maximum number of concurrent vector searches sent to the store at once
+SEARCH_BATCH_SIZE = 32
+
+# Seconds to wait for more concurrent searches before sending a batch
+SEARCH_BATCH_WINDOW = 0.005
+
+class MessageRing:
+    """Fixed-size ring buffer of messages for one SSE connection.
+    
+    Messages are written at ``tail`` and read from ``head``. The
+    connection's event generator is the only reader and takes everything
+    available at once, so a burst of messages costs one wakeup. There are
+    two writers, the broadcast flush and the shared heartbeat task; they
+    never wait, and when the ring is full the oldest message is
+    overwritten. No locking is needed because all access happens on the
+    event loop thread and no method awaits while updating the indices.
+    """
+    
+    def __init__(self, capacity: int = SSE_QUEUE_SIZE):
+        """Initialize an empty ring.
+        
+        Args:
+            capacity: Number of slots, a power of two
+        """
+        if capacity <= 0 or capacity & (capacity - 1):
+            raise ValueError(f"Ring capacity must be a power of two, got {capacity}")
+        self.slots: List[Any] = [None] * capacity
+        self.mask = capacity - 1
+        self.head = 0
+        self.tail = 0
+        self.closed = False
+        self.dropped = 0
+        self.not_empty = asyncio.Event()
+        
+    def __len__(self) -> int:
+        """Return the number of buffered messages."""
+        return self.tail - self.head
+        
+    @property
+    def full(self) -> bool:
+        """Whether the next message would overwrite the oldest one."""
+        return self.tail - self.head > self.mask
+        
+    def put_nowait(self, item: Any) -> bool:
+        """Buffer a message, dropping the oldest one if the ring is full.
+        
+        Messages put after the ring is closed are discarded.
+        
+        Returns:
+            False if a message was dropped, True otherwise
+        """
+        if self.closed:
+            return False
+        delivered = True
+        if self.full:
+            self.head += 1
+            self.dropped += 1
+            delivered = False
+        self.slots[self.tail & self.mask] = item
+        self.tail += 1
+        self.not_empty.set()
+        return delivered
+        
+    async def get(self) -> List[Any]:
+        """Wait for messages and return all buffered ones, oldest first.
+        
+        Returns:
+            The buffered messages, or an empty list once the ring is closed
+        """
+        while self.head == self.tail:
+            if self.closed:
+                return []
+            self.not_empty.clear()
+            await self.not_empty.wait()
+            
+        items = []
+        slots, mask = self.slots, self.mask
+        for index in range(self.head, self.tail):
+            items.append(slots[index & mask])
+            slots[index & mask] = None
+        self.head = self.tail
+        return items
+        
+    def close(self) -> None:
+        """Close the ring and wake the waiting reader."""
+        self.closed = True
+        self.not_empty.set()
+
+def _format_event(message: Any) -> bytes:
+    """Format a message as an SSE data event.
+    
+    Messages that are already encoded frames are returned unchanged.
+    """
+    if isinstance(message, bytes):
+        return message
+    if isinstance(message, dict):
+        data = orjson.dumps(message, default=pydantic_core.to_jsonable_python)
+    else:
+        data = str(message).encode()
+    return b"data: " + data + b"\n\n"
+
+# Monotonic time the cached heartbeat event was built at, and the event
+_heartbeat_frame: Tuple[float, bytes] = (float("-inf"), b"")
+
+def _heartbeat() -> bytes:
+    """Return an encoded heartbeat event, rebuilt at most once per TTL."""
+    global _heartbeat_frame
+    now = time.monotonic()
+    built_at, frame = _heartbeat_frame
+    if now - built_at >= HEARTBEAT_FRAME_TTL:
+        frame = _format_event({"type": "heartbeat", "timestamp": datetime.utcnow().isoformat()})
+        _heartbeat_frame = (now, frame)
+    return frame
+
+async def send_heartbeats(slots: List[Optional[MessageRing]], interval: int = 30):
+    """Send periodic heartbeat messages to keep the connections alive.
+    
+    One task serves every connection, so the event loop holds a single
+    timer however many clients are connected. Connections whose buffer is
+    full already have data pending and are skipped, so heartbeats never
+    push out messages.
     
     Args:
-        queue: The queue to send heartbeats to
+        slots: The connection buffers to send heartbeats to, None for free slots
         interval: Time between heartbeats in seconds
     """
     while True:
         try:
-            await queue.put({"type": "heartbeat", "timestamp": datetime.utcnow().isoformat()})
             await asyncio.sleep(interval)
+            # Every connection gets the same encoded heartbeat
+            frame = _heartbeat()
+            for ring in slots:
+                if ring is not None and not ring.full:
+                    ring.put_nowait(frame)
         except asyncio.CancelledError:
             break
         except Exception as e:
             logger.error(f"Error sending heartbeat: {e}")
-            await asyncio.sleep(1)  # Brief pause before retrying
+
+class SSEResponse(StreamingResponse):
+    """Streaming response for SSE connections.
+    
+    Streaming, disconnect handling and background tasks are Starlette's;
+    only the headers differ, and those are encoded once at import.
+    """
+    
+    media_type = "text/event-stream"
+    
+    def __init__(self, body_iterator: AsyncIterator[bytes]):
+        """Initialize the response.
+        
+        Args:
+            body_iterator: The encoded SSE events to send
+        """
+        super().__init__(body_iterator, media_type=self.media_type)
+        
+    def init_headers(self, headers: Optional[Mapping[str, str]] = None) -> None:
+        """Use the pre-encoded SSE headers."""
+        self.raw_headers = list(_SSE_RAW_HEADERS)
 
 class CodebaseInsightSseTransport(SseServerTransport):
     """Custom SSE transport implementation for Codebase Insight."""
@@ -46,45 +226,81 @@ class CodebaseInsightSseTransport(SseServerTransport):
             endpoint: The endpoint path for SSE connections
         """
         super().__init__(endpoint)
-        self.connections = {}
-        self.message_queue = asyncio.Queue()
+        # Connection buffers by connection id; ids of closed connections
+        # are kept in a free list and reused
+        self._slots: List[Optional[MessageRing]] = []
+        self._free: List[int] = []
+        self.connection_count = 0
+        # Writes dropped because a client's buffer was full; each write
+        # carries the messages sent during one event loop iteration
+        self.dropped_messages = 0
+        # Encoded messages waiting for the next fan-out to the connections
+        self._outbox: Deque[bytes] = deque()
+        self._flush_scheduled = False
+        # Shared heartbeat task, running while any connection is open
+        self._heartbeat_task: Optional[asyncio.Task] = None
         logger.info(f"Initializing SSE transport with endpoint: {endpoint}")
         
-    async def handle_sse(self, request: Request) -> StreamingResponse:
+    def _add_connection(self, ring: MessageRing) -> int:
+        """Store a connection buffer and return its connection id."""
+        if self._free:
+            connection_id = self._free.pop()
+            self._slots[connection_id] = ring
+        else:
+            connection_id = len(self._slots)
+            self._slots.append(ring)
+        self.connection_count += 1
+        return connection_id
+        
+    def _remove_connection(self, connection_id: int) -> Optional[MessageRing]:
+        """Remove a connection and return its buffer, if it was open."""
+        if not 0 <= connection_id < len(self._slots):
+            return None
+        ring = self._slots[connection_id]
+        if ring is not None:
+            self._slots[connection_id] = None
+            self._free.append(connection_id)
+            self.connection_count -= 1
+        return ring
+        
+    async def handle_sse(self, request: Request) -> SSEResponse:
         """Handle incoming SSE connection requests.
         
         Args:
             request: The incoming HTTP request
             
         Returns:
-            StreamingResponse for the SSE connection
+            SSEResponse for the SSE connection
         """
-        connection_id = str(uuid.uuid4())
-        queue = asyncio.Queue()
-        self.connections[connection_id] = queue
+        # Bounded, so a slow client loses old messages instead of
+        # holding up broadcasts
+        ring = MessageRing(SSE_QUEUE_SIZE)
+        connection_id = self._add_connection(ring)
         
         logger.info(f"New SSE connection established: {connection_id}")
-        logger.debug(f"Request headers: {dict(request.headers)}")
-        logger.debug(f"Active connections: {len(self.connections)}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Request headers: {request.headers!r}")
+            logger.debug(f"Active connections: {self.connection_count}")
         
-        async def event_generator():
+        async def event_generator() -> AsyncIterator[bytes]:
             try:
-                logger.debug(f"Starting event generator for connection {connection_id}")
-                heartbeat_task = asyncio.create_task(send_heartbeats(queue))
-                logger.debug(f"Heartbeat task started for connection {connection_id}")
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug(f"Starting event generator for connection {connection_id}")
+                ring.put_nowait(_heartbeat())
+                self._start_heartbeats()
                 
                 while True:
                     try:
-                        message = await queue.get()
-                        logger.debug(f"Connection {connection_id} received message: {message}")
-                        
-                        if isinstance(message, dict):
-                            data = json.dumps(message)
-                        else:
-                            data = str(message)
+                        messages = await ring.get()
+                        if not messages:
+                            # The ring was closed: the connection was shut down
+                            break
                             
-                        yield f"data: {data}\n\n"
-                        logger.debug(f"Sent message to connection {connection_id}")
+                        # Messages are already encoded frames; send everything
+                        # queued in one write
+                        yield b"".join(messages)
+                        if logger.isEnabledFor(logging.DEBUG):
+                            logger.debug(f"Sent {len(messages)} messages to connection {connection_id}")
                         
                     except asyncio.CancelledError:
                         logger.info(f"Event generator cancelled for connection {connection_id}")
@@ -94,30 +310,33 @@ class CodebaseInsightSseTransport(SseServerTransport):
                         break
                         
             finally:
-                heartbeat_task.cancel()
-                try:
-                    await heartbeat_task
-                except asyncio.CancelledError:
-                    pass
-                    
-                if connection_id in self.connections:
-                    del self.connections[connection_id]
+                if self._slots[connection_id] is ring:
+                    self._remove_connection(connection_id)
+                if not self.connection_count:
+                    await self._stop_heartbeats()
+                ring.close()
                 logger.info(f"Event generator cleaned up for connection {connection_id}")
-                logger.debug(f"Remaining active connections: {len(self.connections)}")
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug(f"Remaining active connections: {self.connection_count}")
                 
-        return StreamingResponse(
-            event_generator(),
-            media_type="text/event-stream",
-            headers={
-                "Cache-Control": "no-cache",
-                "Connection": "keep-alive",
-                "X-Accel-Buffering": "no",
-                "Access-Control-Allow-Origin": "*",  # Allow CORS
-                "Access-Control-Allow-Headers": "Content-Type",
-                "Access-Control-Allow-Methods": "GET, POST"
-            }
-        )
+        return SSEResponse(event_generator())
         
+    def _start_heartbeats(self) -> None:
+        """Start the shared heartbeat task if it is not running."""
+        if self._heartbeat_task is None or self._heartbeat_task.done():
+            self._heartbeat_task = asyncio.create_task(send_heartbeats(self._slots))
+            logger.debug("Heartbeat task started")
+            
+    async def _stop_heartbeats(self) -> None:
+        """Stop the shared heartbeat task."""
+        task, self._heartbeat_task = self._heartbeat_task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+                
     async def handle_message(self, request: Request) -> Response:
         """Handle incoming messages to be broadcast over SSE.
         
@@ -128,11 +347,10 @@ class CodebaseInsightSseTransport(SseServerTransport):
             HTTP response indicating message handling status
         """
         try:
-            message = await request.json()
+            message = orjson.loads(await request.body())
             
             # Broadcast to all connections
-            for queue in self.connections.values():
-                await queue.put(message)
+            await self.send(message)
                 
             return JSONResponse({"status": "message sent"})
             
@@ -149,9 +367,25 @@ class CodebaseInsightSseTransport(SseServerTransport):
         Args:
             message: The message to send
         """
-        # Put message in queue for all connections
-        for queue in self.connections.values():
-            await queue.put(message)
+        # Encode once; messages sent during the same event loop iteration
+        # are fanned out to the connections together
+        self._outbox.append(_format_event(message))
+        if not self._flush_scheduled:
+            self._flush_scheduled = True
+            asyncio.get_running_loop().call_soon(self._flush_outbox)
+            
+    def _flush_outbox(self) -> None:
+        """Put all pending messages in the buffer of every connection.
+        
+        Slow clients are never waited on; see MessageRing.put_nowait.
+        """
+        self._flush_scheduled = False
+        outbox = self._outbox
+        frame = outbox[0] if len(outbox) == 1 else b"".join(outbox)
+        outbox.clear()
+        for ring in self._slots:
+            if ring is not None and not ring.put_nowait(frame):
+                self.dropped_messages += 1
             
     async def broadcast(self, message: Any) -> None:
         """Broadcast a message to all connected clients.
@@ -161,33 +395,257 @@ class CodebaseInsightSseTransport(SseServerTransport):
         """
         await self.send(message)
         
-    async def connect(self) -> Tuple[MemoryObjectReceiveStream, MemoryObjectSendStream]:
+    async def open_connection(self) -> Tuple[int, MessageRing]:
         """Create a new SSE connection.
         
+        Close it with disconnect().
+        
         Returns:
-            Tuple of receive and send streams for the connection
+            Tuple of the connection id and the buffer its messages arrive in
         """
-        # Create memory object streams for this connection
-        receive_stream = MemoryObjectReceiveStream()
-        send_stream = MemoryObjectSendStream()
+        # Create the message buffer for this connection
+        ring = MessageRing(SSE_QUEUE_SIZE)
         
         # Store the connection
-        connection_id = str(uuid.uuid4())
-        self.connections[connection_id] = send_stream
+        connection_id = self._add_connection(ring)
         
-        return receive_stream, send_stream
+        return connection_id, ring
         
-    async def disconnect(self, connection_id: str) -> None:
+    async def disconnect(self, connection_id: int) -> None:
         """Disconnect a client.
         
         Args:
             connection_id: The ID of the connection to disconnect
         """
-        if connection_id in self.connections:
-            del self.connections[connection_id]
+        ring = self._remove_connection(connection_id)
+        if ring is not None:
+            ring.close()
             logger.info(f"Disconnected client: {connection_id}")
 
-async def verify_routes(app: Starlette) -> Dict[str, List[str]]:
+class BatchedSearcher:
+    """Coalesces concurrent vector searches into batched vector store requests.
+    
+    Searches submitted within a short window that share their filter
+    conditions and limit are sent to the vector store as one batch.
+    """
+    
+    def __init__(
+        self,
+        vector_store,
+        max_batch: int = SEARCH_BATCH_SIZE,
+        window: float = SEARCH_BATCH_WINDOW,
+        payload_fields: Optional[List[str]] = None
+    ):
+        """Initialize the searcher.
+        
+        Args:
+            vector_store: Vector store providing search_batch
+            max_batch: Maximum number of searches per batch
+            window: Seconds to wait for more searches before sending a batch
+            payload_fields: Optional payload keys to fetch for each result
+        """
+        self.vector_store = vector_store
+        self.payload_fields = payload_fields
+        self.max_batch = max_batch
+        self.window = window
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self._task: Optional[asyncio.Task] = None
+        
+    async def search(
+        self,
+        vector: List[float],
+        filter_conditions: Optional[Dict] = None,
+        limit: int = 5,
+        text: str = "",
+        score_threshold: Optional[float] = None
+    ) -> List[Any]:
+        """Queue a search and wait for its results.
+        
+        Args:
+            vector: Query embedding
+            filter_conditions: Optional filter conditions
+            limit: Maximum number of results to return
+            text: Query text
+            score_threshold: Optional minimum score
+            
+        Returns:
+            List of search results
+        """
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._process_batches())
+            
+        future = asyncio.get_running_loop().create_future()
+        self.queue.put_nowait((vector, filter_conditions, limit, score_threshold, text, future))
+        return await future
+        
+    async def stop(self) -> None:
+        """Stop processing searches and cancel every unfinished one."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            
+        while not self.queue.empty():
+            future = self.queue.get_nowait()[5]
+            if not future.done():
+                future.cancel()
+        
+    async def _process_batches(self) -> None:
+        """Collect queued searches into batches and run them."""
+        while True:
+            batch = [await self.queue.get()]
+            try:
+                # A lone search is sent at once; only wait for more when
+                # other searches are already queued behind it
+                if not self.queue.empty():
+                    await asyncio.sleep(self.window)
+                while len(batch) < self.max_batch and not self.queue.empty():
+                    batch.append(self.queue.get_nowait())
+                    
+                # Only searches with the same filters, limit and threshold
+                # can share a request
+                groups: Dict[Tuple, List[Tuple]] = {}
+                for item in batch:
+                    key = (orjson.dumps(item[1], default=dict, option=orjson.OPT_SORT_KEYS), item[2], item[3])
+                    groups.setdefault(key, []).append(item)
+                    
+                await asyncio.gather(*(self._search_group(items) for items in groups.values()))
+            finally:
+                # Callers of a batch interrupted by stop() or an error must
+                # not wait forever
+                for item in batch:
+                    if not item[5].done():
+                        item[5].cancel()
+            
+    async def _search_group(self, items: List[Tuple]) -> None:
+        """Run one batched search and deliver each result to its caller."""
+        _, filter_conditions, limit, score_threshold, _, _ = items[0]
+        try:
+            results = await self.vector_store.search_batch(
+                [item[0] for item in items],
+                filter_conditions=filter_conditions,
+                limit=limit,
+                texts=[item[4] for item in items],
+                score_threshold=score_threshold,
+                payload_fields=self.payload_fields
+            )
+        except Exception as e:
+            for item in items:
+                if not item[5].done():
+                    item[5].set_exception(e)
+            return
+            
+        for item, result in zip(items, results):
+            if not item[5].done():
+                item[5].set_result(result)
+
+# Vector store filter key and operator for each vector search filter argument
+_FILTER_OPERATORS = (("file_type", "$eq"), ("path", "$like"))
+
+@lru_cache(maxsize=256)
+def _build_filter_conditions(
+    file_type: Optional[str],
+    path_pattern: Optional[str]
+) -> Optional[Mapping[str, Mapping[str, str]]]:
+    """Build vector store filter conditions from vector search arguments.
+    
+    Conditions are cached and shared between calls, so they are read-only.
+    """
+    if not (file_type or path_pattern):
+        return None
+    return MappingProxyType({
+        key: MappingProxyType({operator: value})
+        for (key, operator), value in zip(_FILTER_OPERATORS, (file_type, path_pattern))
+        if value
+    })
+
+# Payload keys read by _format_vector_results
+_VECTOR_RESULT_FIELDS = ("text", "file_path", "line_range", "type", "language", "timestamp")
+
+@dataclass(frozen=True, slots=True)
+class VectorHit:
+    """Vector search result returned by the vector-search tool."""
+    
+    id: Any
+    score: float
+    text: str
+    file_path: str
+    line_range: str
+    type: str
+    language: str
+    timestamp: str
+
+@dataclass(frozen=True, slots=True)
+class PatternHit:
+    """Knowledge base pattern returned by the knowledge-search tool."""
+    
+    id: Any
+    pattern: Any
+    description: str
+    type: Any
+    confidence: Any
+    metadata: Optional[Dict[str, Any]]
+
+@dataclass(frozen=True, slots=True)
+class AdrEntry:
+    """ADR summary returned by the adr-list tool."""
+    
+    id: Any
+    title: str
+    status: Any
+    date: Optional[str]
+    authors: Any
+    summary: Any
+
+def _format_vector_results(results) -> List[VectorHit]:
+    """Format vector store search results for MCP responses."""
+    formatted = []
+    for result in results:
+        get = result.metadata.get
+        formatted.append(VectorHit(
+            result.id,
+            result.score,
+            get("text", ""),
+            get("file_path", ""),
+            get("line_range", ""),
+            get("type", "code"),
+            get("language", ""),
+            get("timestamp", "")
+        ))
+    return formatted
+
+def _format_pattern_results(results) -> List[PatternHit]:
+    """Format knowledge base search results for MCP responses."""
+    return [
+        PatternHit(
+            result.id,
+            result.pattern,
+            result.description,
+            result.type,
+            result.confidence,
+            result.metadata
+        )
+        for result in results
+    ]
+
+def _format_adrs(adrs) -> List[AdrEntry]:
+    """Format ADRs for MCP responses."""
+    return [
+        AdrEntry(
+            adr.id,
+            adr.title,
+            adr.status,
+            adr.date.isoformat() if adr.date else None,
+            adr.authors,
+            adr.summary
+        )
+        for adr in adrs
+    ]
+
+def verify_routes(app: Starlette) -> Dict[str, List[str]]:
     """Verify and log all registered routes in the application.
     
     Args:
@@ -201,7 +659,7 @@ async def verify_routes(app: Starlette) -> Dict[str, List[str]]:
         if isinstance(route, Mount):
             logger.info(f"Mount point: {route.path}")
             # Recursively verify mounted routes
-            mounted_routes = await verify_routes(route.app)
+            mounted_routes = verify_routes(route.app)
             for path, methods in mounted_routes.items():
                 full_path = f"{route.path}{path}"
                 routes[full_path] = methods
@@ -239,7 +697,8 @@ def create_sse_server(mcp_server: Optional[FastMCP] = None) -> Starlette:
         return JSONResponse({
             "status": "ok",
             "timestamp": datetime.utcnow().isoformat(),
-            "connections": len(transport.connections)
+            "connections": transport.connection_count,
+            "dropped_messages": transport.dropped_messages
         })
     
     # Add routes
@@ -247,11 +706,171 @@ def create_sse_server(mcp_server: Optional[FastMCP] = None) -> Starlette:
     app.add_route("/sse", transport.handle_sse, methods=["GET"])
     app.add_route("/message", transport.handle_message, methods=["POST"])
     
-    logger.info("Created SSE server with routes:")
-    asyncio.create_task(verify_routes(app))
+    if logger.isEnabledFor(logging.INFO):
+        logger.info("Created SSE server with routes:")
+        verify_routes(app)
     
     return app
 
+def _make_vector_search(vector_store) -> Optional[Callable]:
+    """Create the vector search tool function, or None if unsupported."""
+    # Verify that the vector store is properly initialized
+    if not hasattr(vector_store, 'search') or not callable(getattr(vector_store, 'search')):
+        logger.warning("Vector store component does not have a search method, skipping tool registration")
+        return None
+        
+    # Reuse results of repeated queries; embedding the query separately is
+    # only possible when the store exposes its embedder
+    cache = MemoryCache(SEARCH_CACHE_SIZE)
+    cache_generation = None
+    can_cache = all(
+        hasattr(vector_store, attr)
+        for attr in ("embedder", "search_batch", "generation")
+    )
+    searcher = None
+    if can_cache:
+        searcher = BatchedSearcher(
+            vector_store,
+            payload_fields=list(_VECTOR_RESULT_FIELDS)
+        )
+        
+    # Embeddings being computed, by query text; concurrent requests for
+    # the same query share one embedding call
+    pending_embeddings: Dict[str, asyncio.Future] = {}
+    
+    async def embed_query(query: str) -> List[float]:
+        future = pending_embeddings.get(query)
+        if future is None:
+            future = asyncio.ensure_future(vector_store.embedder.embed(query))
+            pending_embeddings[query] = future
+            future.add_done_callback(lambda _: pending_embeddings.pop(query, None))
+        # Shield the shared call from cancellation of a single request
+        return await asyncio.shield(future)
+        
+    async def vector_search(query: str, limit: int = 5, threshold: float = 0.7, 
+                      file_type: Optional[str] = None, path_pattern: Optional[str] = None):
+        """Search for code snippets semantically similar to the query text."""
+        nonlocal cache_generation
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"MCP vector search request: {query=}, {limit=}, {threshold=}")
+        
+        if can_cache:
+            # Drop cached results once the store has been written to
+            if vector_store.generation != cache_generation:
+                cache.clear()
+                cache_generation = vector_store.generation
+                
+            # Repeated queries skip embedding entirely
+            key = (query, file_type, path_pattern, limit, threshold)
+            now = time.monotonic()
+            entry = cache.get(key)
+            if entry is not None and entry[0] > now:
+                # Each caller gets its own response and results list
+                return {"results": list(entry[1])}
+                
+            results = await searcher.search(
+                await embed_query(query),
+                filter_conditions=_build_filter_conditions(file_type, path_pattern),
+                limit=limit,
+                text=query,
+                score_threshold=threshold
+            )
+            formatted_results = _format_vector_results(results)
+            cache.put(key, (now + SEARCH_CACHE_TTL, tuple(formatted_results)))
+            return {"results": formatted_results}
+            
+        # Stores without the batched API may not take a score threshold,
+        # so low scores are dropped here instead
+        results = await vector_store.search(
+            text=query,
+            filter_conditions=_build_filter_conditions(file_type, path_pattern),
+            limit=limit
+        )
+        formatted_results = _format_vector_results(
+            result for result in results if result.score >= threshold
+        )
+        
+        return {"results": formatted_results}
+        
+    # Exposed so the server can stop the searcher on cleanup
+    vector_search.searcher = searcher
+    return vector_search
+
+def _make_search_knowledge(knowledge_base) -> Callable:
+    """Create the knowledge search tool function."""
+    async def search_knowledge(query: str, pattern_type: str = "code", limit: int = 5):
+        """Search for patterns in the knowledge base."""
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"MCP knowledge search request: {query=}, {pattern_type=}, {limit=}")
+        
+        results = await knowledge_base.search_patterns(
+            query=query,
+            pattern_type=pattern_type,
+            limit=limit
+        )
+        
+        formatted_results = _format_pattern_results(results)
+        
+        return {"results": formatted_results}
+        
+    return search_knowledge
+
+def _make_list_adrs(adr_manager) -> Callable:
+    """Create the ADR list tool function."""
+    async def list_adrs(status: Optional[str] = None, limit: int = 10):
+        """List architectural decision records."""
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"MCP ADR list request: {status=}, {limit=}")
+        
+        try:
+            adrs = await adr_manager.list_adrs(status=status, limit=limit)
+            
+            formatted_results = _format_adrs(adrs)
+            
+            return {"adrs": formatted_results}
+        except Exception as e:
+            logger.error(f"Error listing ADRs: {e}", exc_info=True)
+            return {"error": str(e), "adrs": []}
+        
+    return list_adrs
+
+def _make_get_task_status(task_tracker) -> Callable:
+    """Create the task status tool function."""
+    async def get_task_status(task_id: str):
+        """Get the status of a specific task."""
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"MCP task status request: {task_id=}")
+        
+        try:
+            status = await task_tracker.get_task_status(task_id)
+            return status
+        except Exception as e:
+            logger.error(f"Error getting task status: {e}", exc_info=True)
+            return {"error": str(e), "status": "unknown"}
+        
+    return get_task_status
+
+# MCP tools by the component they expose: tool name, component label for
+# log messages, tool function factory and description
+_TOOLS = {
+    "vector_store": (
+        "vector-search", "Vector store", _make_vector_search,
+        "Search for code snippets semantically similar to the query text"
+    ),
+    "knowledge_base": (
+        "knowledge-search", "Knowledge base", _make_search_knowledge,
+        "Search for patterns in the knowledge base"
+    ),
+    "adr_manager": (
+        "adr-list", "ADR manager", _make_list_adrs,
+        "List architectural decision records"
+    ),
+    "task_tracker": (
+        "task-status", "Task tracker", _make_get_task_status,
+        "Get the status of a specific task"
+    ),
+}
+
 class MCP_CodebaseInsightServer:
     """MCP server implementation for Codebase Insight.
     
@@ -269,6 +888,7 @@ class MCP_CodebaseInsightServer:
         self.mcp_server = FastMCP(name="MCP-Codebase-Insight")
         self.tools_registered = False
         self._starlette_app = None  # Cache the Starlette app
+        self._searcher: Optional[BatchedSearcher] = None
         logger.info("MCP Codebase Insight server initialized")
         
     async def cleanup(self):
@@ -280,6 +900,9 @@ class MCP_CodebaseInsightServer:
         logger.info("Cleaning up MCP server resources")
         # If the MCP server has a shutdown or cleanup method, call it here
         # For now, just log the cleanup attempt
+        if self._searcher is not None:
+            await self._searcher.stop()
+            self._searcher = None
         self.tools_registered = False
         self._starlette_app = None
         logger.info("MCP server cleanup completed")
@@ -304,13 +927,18 @@ class MCP_CodebaseInsightServer:
             
         logger.info("Registering tools with MCP server")
         
+        # Look up each component once and share it with the tool helpers
+        components = {
+            name: self.state.get_component(name)
+            for name in ("vector_store", "knowledge_base", "task_manager", "adr_manager", "task_tracker")
+        }
+        
         # Check if critical dependencies are available
         critical_dependencies = ["vector_store", "knowledge_base", "task_manager", "adr_manager"]
-        missing_dependencies = []
-        
-        for dependency in critical_dependencies:
-            if not self.state.get_component(dependency):
-                missing_dependencies.append(dependency)
+        missing_dependencies = [
+            dependency for dependency in critical_dependencies
+            if not components[dependency]
+        ]
                 
         if missing_dependencies:
             logger.warning(f"Some critical dependencies are not available: {', '.join(missing_dependencies)}")
@@ -319,10 +947,8 @@ class MCP_CodebaseInsightServer:
         
         # Register available tools
         try:
-            self._register_vector_search()
-            self._register_knowledge()
-            self._register_adr()
-            self._register_task()
+            for component_name in _TOOLS:
+                self._register_tool(component_name, components[component_name])
             
             # Mark tools as registered even if some failed
             self.tools_registered = True
@@ -331,163 +957,48 @@ class MCP_CodebaseInsightServer:
             logger.error(f"Error registering MCP tools: {e}", exc_info=True)
             # Don't mark as registered if there was an error
         
-    def _register_vector_search(self):
-        """Register the vector search tool with the MCP server."""
-        vector_store = self.state.get_component("vector_store")
-        if not vector_store:
-            logger.warning("Vector store component not available, skipping tool registration")
+    def _register_tool(self, component_name: str, component=None):
+        """Register the tool exposing a component with the MCP server.
+        
+        Args:
+            component_name: Name of the component in the server state
+            component: The component, looked up in the server state if not given
+        """
+        name, label, factory, description = _TOOLS[component_name]
+        if component is None:
+            component = self.state.get_component(component_name)
+        if not component:
+            logger.warning(f"{label} component not available, skipping tool registration")
             return
             
-        # Verify that the vector store is properly initialized
-        if not hasattr(vector_store, 'search') or not callable(getattr(vector_store, 'search')):
-            logger.warning("Vector store component does not have a search method, skipping tool registration")
+        fn = factory(component)
+        if fn is None:
             return
+        searcher = getattr(fn, "searcher", None)
+        if searcher is not None:
+            self._searcher = searcher
             
-        async def vector_search(query: str, limit: int = 5, threshold: float = 0.7, 
-                          file_type: Optional[str] = None, path_pattern: Optional[str] = None):
-            """Search for code snippets semantically similar to the query text."""
-            logger.debug(f"MCP vector search request: {query=}, {limit=}, {threshold=}")
-            
-            # Prepare filters if provided
-            filter_conditions = {}
-            if file_type:
-                filter_conditions["file_type"] = {"$eq": file_type}
-            if path_pattern:
-                filter_conditions["path"] = {"$like": path_pattern}
-                
-            results = await vector_store.search(
-                text=query,
-                filter_conditions=filter_conditions if filter_conditions else None,
-                limit=limit
-            )
-            
-            # Format results
-            formatted_results = [
-                {
-                    "id": result.id,
-                    "score": result.score,
-                    "text": result.metadata.get("text", ""),
-                    "file_path": result.metadata.get("file_path", ""),
-                    "line_range": result.metadata.get("line_range", ""),
-                    "type": result.metadata.get("type", "code"),
-                    "language": result.metadata.get("language", ""),
-                    "timestamp": result.metadata.get("timestamp", "")
-                }
-                for result in results
-                if result.score >= threshold
-            ]
-            
-            return {"results": formatted_results}
-            
-        self.mcp_server.add_tool(
-            name="vector-search",
-            fn=vector_search,
-            description="Search for code snippets semantically similar to the query text"
-        )
-        logger.debug("Vector search tool registered")
+        self.mcp_server.add_tool(name=name, fn=fn, description=description)
+        logger.debug(f"Tool {name} registered")
+        
+    # The per-tool helpers below are kept only for the existing tests, which
+    # register tools one at a time
+    
+    def _register_vector_search(self, vector_store=None):
+        """Register the vector search tool with the MCP server."""
+        self._register_tool("vector_store", vector_store)
         
-    def _register_knowledge(self):
+    def _register_knowledge(self, knowledge_base=None):
         """Register the knowledge base tool with the MCP server."""
-        knowledge_base = self.state.get_component("knowledge_base")
-        if not knowledge_base:
-            logger.warning("Knowledge base component not available, skipping tool registration")
-            return
-            
-        async def search_knowledge(query: str, pattern_type: str = "code", limit: int = 5):
-            """Search for patterns in the knowledge base."""
-            logger.debug(f"MCP knowledge search request: {query=}, {pattern_type=}, {limit=}")
-            
-            results = await knowledge_base.search_patterns(
-                query=query,
-                pattern_type=pattern_type,
-                limit=limit
-            )
-            
-            # Format results
-            formatted_results = [
-                {
-                    "id": result.id,
-                    "pattern": result.pattern,
-                    "description": result.description,
-                    "type": result.type,
-                    "confidence": result.confidence,
-                    "metadata": result.metadata
-                }
-                for result in results
-            ]
-            
-            return {"results": formatted_results}
-            
-        self.mcp_server.add_tool(
-            name="knowledge-search",
-            fn=search_knowledge,
-            description="Search for patterns in the knowledge base"
-        )
-        logger.debug("Knowledge search tool registered")
+        self._register_tool("knowledge_base", knowledge_base)
         
-    def _register_adr(self):
+    def _register_adr(self, adr_manager=None):
         """Register the ADR management tool with the MCP server."""
-        adr_manager = self.state.get_component("adr_manager")
-        if not adr_manager:
-            logger.warning("ADR manager component not available, skipping tool registration")
-            return
-            
-        async def list_adrs(status: Optional[str] = None, limit: int = 10):
-            """List architectural decision records."""
-            logger.debug(f"MCP ADR list request: {status=}, {limit=}")
-            
-            try:
-                adrs = await adr_manager.list_adrs(status=status, limit=limit)
-                
-                # Format results
-                formatted_results = [
-                    {
-                        "id": adr.id,
-                        "title": adr.title,
-                        "status": adr.status,
-                        "date": adr.date.isoformat() if adr.date else None,
-                        "authors": adr.authors,
-                        "summary": adr.summary
-                    }
-                    for adr in adrs
-                ]
-                
-                return {"adrs": formatted_results}
-            except Exception as e:
-                logger.error(f"Error listing ADRs: {e}", exc_info=True)
-                return {"error": str(e), "adrs": []}
-                
-        self.mcp_server.add_tool(
-            name="adr-list",
-            fn=list_adrs,
-            description="List architectural decision records"
-        )
-        logger.debug("ADR management tool registered")
+        self._register_tool("adr_manager", adr_manager)
         
-    def _register_task(self):
+    def _register_task(self, task_tracker=None):
         """Register the task management tool with the MCP server."""
-        task_tracker = self.state.get_component("task_tracker")
-        if not task_tracker:
-            logger.warning("Task tracker component not available, skipping tool registration")
-            return
-            
-        async def get_task_status(task_id: str):
-            """Get the status of a specific task."""
-            logger.debug(f"MCP task status request: {task_id=}")
-            
-            try:
-                status = await task_tracker.get_task_status(task_id)
-                return status
-            except Exception as e:
-                logger.error(f"Error getting task status: {e}", exc_info=True)
-                return {"error": str(e), "status": "unknown"}
-                
-        self.mcp_server.add_tool(
-            name="task-status",
-            fn=get_task_status,
-            description="Get the status of a specific task"
-        )
-        logger.debug("Task management tool registered")
+        self._register_tool("task_tracker", task_tracker)
         
     def get_starlette_app(self) -> Starlette:
         """Get the Starlette application for the MCP server.
@@ -496,7 +1007,8 @@ class MCP_CodebaseInsightServer:
             Configured Starlette application
         """
         # Ensure tools are registered
-        self.register_tools()
+        if not self.tools_registered:
+            self.register_tools()
         
         # Create and return the Starlette app for SSE
         if self._starlette_app is None:
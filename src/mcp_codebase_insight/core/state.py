@@ -18,7 +18,18 @@ from .component_status import ComponentStatus
 
 logger = get_logger(__name__)
 
-@dataclass
+# Components the server initializes, in initialization order
+_COMPONENT_NAMES = (
+    "database",
+    "vector_store",
+    "task_manager",
+    "analysis_engine",
+    "adr_manager",
+    "knowledge_base",
+    "mcp_server"
+)
+
+@dataclass(slots=True)
 class ComponentState:
     """State tracking for a server component."""
     status: ComponentStatus = ComponentStatus.UNINITIALIZED
@@ -37,19 +48,39 @@ class ServerState:
         self._cleanup_lock = asyncio.Lock()
         self.initialized = False
         self.config: Optional[ServerConfig] = None
-        self._components: Dict[str, ComponentState] = {}
+        # Component states by slot, None until registered; the server's own
+        # components have fixed slots and others are appended on registration
+        self._component_index: Dict[str, int] = {
+            name: index for index, name in enumerate(_COMPONENT_NAMES)
+        }
+        self._component_names: List[str] = list(_COMPONENT_NAMES)
+        self._components: List[Optional[ComponentState]] = [None] * len(_COMPONENT_NAMES)
+        # Last get_component_status() result, None once a component changes
+        self._status_cache: Optional[Dict[str, Any]] = None
         self._cleanup_handlers: List[asyncio.Task] = []
         self._task_tracker = TaskTracker()
         self._instance_id = str(uuid.uuid4())
         logger.info(f"Created ServerState instance {self._instance_id}")
     
+    def _component_state(self, name: str) -> Optional[ComponentState]:
+        """Get a component's state, or None if it is not registered."""
+        index = self._component_index.get(name)
+        return None if index is None else self._components[index]
+    
     def register_component(self, name: str, instance: Any = None) -> None:
         """Register a new component."""
-        if name not in self._components:
+        index = self._component_index.get(name)
+        if index is None:
+            index = self._component_index[name] = len(self._components)
+            self._component_names.append(name)
+            self._components.append(None)
+            
+        if self._components[index] is None:
             component_state = ComponentState()
             if instance:
                 component_state.instance = instance
-            self._components[name] = component_state
+            self._components[index] = component_state
+            self._status_cache = None
             logger.debug(f"Registered component: {name}")
     
     def update_component_status(
@@ -60,10 +91,11 @@ class ServerState:
         instance: Any = None
     ) -> None:
         """Update component status."""
-        if name not in self._components:
+        component = self._component_state(name)
+        if component is None:
             self.register_component(name)
+            component = self._component_state(name)
         
-        component = self._components[name]
         component.status = status
         component.error = error
         component.last_update = datetime.utcnow()
@@ -73,6 +105,7 @@ class ServerState:
         
         if status == ComponentStatus.FAILED:
             component.retry_count += 1
+        self._status_cache = None
         
         logger.debug(
             f"Component {name} status updated to {status}"
@@ -81,11 +114,11 @@ class ServerState:
     
     def get_component(self, name: str) -> Any:
         """Get component instance."""
-        if name not in self._components:
+        component = self._component_state(name)
+        if component is None:
             logger.warning(f"Component {name} not registered")
             return None
             
-        component = self._components[name]
         if component.status != ComponentStatus.INITIALIZED:
             logger.warning(f"Component {name} not initialized (status: {component.status.value})")
             return None
@@ -114,14 +147,14 @@ class ServerState:
             await self.cancel_background_tasks()
             
             # Clean up components in reverse order
-            components = list(self._components.keys())
+            components = self.list_components()
             components.reverse()
             
             for component in components:
                 self.update_component_status(component, ComponentStatus.CLEANING)
                 try:
                     # Component-specific cleanup logic here
-                    comp_instance = self._components[component].instance
+                    comp_instance = self._component_state(component).instance
                     if comp_instance and hasattr(comp_instance, 'cleanup'):
                         await comp_instance.cleanup()
                     
@@ -144,8 +177,15 @@ class ServerState:
             logger.info(f"Server instance {self._instance_id} cleanup completed")
     
     def get_component_status(self) -> Dict[str, Any]:
-        """Get status of all components."""
-        return {
+        """Get status of all components.
+        
+        The statuses are built once and reused until a component is
+        registered or updated; each call returns its own copy of the mapping.
+        """
+        if self._status_cache is not None:
+            return dict(self._status_cache)
+            
+        self._status_cache = {
             name: {
                 "status": comp.status.value,
                 "error": comp.error,
@@ -153,8 +193,10 @@ class ServerState:
                 "retry_count": comp.retry_count,
                 "instance_id": comp.instance_id
             }
-            for name, comp in self._components.items()
+            for name, comp in zip(self._component_names, self._components)
+            if comp is not None
         }
+        return dict(self._status_cache)
     
     def register_cleanup_handler(self, task: asyncio.Task) -> None:
         """Register a cleanup handler task."""
@@ -168,7 +210,11 @@ class ServerState:
     
     def list_components(self) -> List[str]:
         """List all registered components."""
-        return list(self._components.keys())
+        return [
+            name
+            for name, comp in zip(self._component_names, self._components)
+            if comp is not None
+        ]
     
     def get_active_tasks(self) -> Set[asyncio.Task]:
         """Get all currently active tasks."""
@@ -189,17 +235,7 @@ class ServerState:
             
             try:
                 # Initialize components in order
-                components = [
-                    "database",
-                    "vector_store",
-                    "task_manager",
-                    "analysis_engine",
-                    "adr_manager",
-                    "knowledge_base",
-                    "mcp_server"  
-                ]
-                
-                for component in components:
+                for component in _COMPONENT_NAMES:
                     self.update_component_status(component, ComponentStatus.INITIALIZING)
                     try:
                         # Component-specific initialization logic here
@@ -315,8 +351,8 @@ class ServerState:
                 critical_components = ["vector_store", "task_manager", "mcp_server"]  
                 
                 all_critical_initialized = all(
-                    self._components.get(c) and 
-                    self._components[c].status == ComponentStatus.INITIALIZED 
+                    self._component_state(c) is not None and 
+                    self._component_state(c).status == ComponentStatus.INITIALIZED 
                     for c in critical_components
                 )
                 
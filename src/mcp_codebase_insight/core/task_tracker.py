@@ -2,8 +2,8 @@
 
 import asyncio
 import logging
+import time
 from typing import Set, Optional
-from datetime import datetime
 
 from ..utils.logger import get_logger
 
@@ -17,7 +17,7 @@ class TaskTracker:
         self._tasks: Set[asyncio.Task] = set()
         self._loop = asyncio.get_event_loop()
         self._loop_id = id(self._loop)
-        self._start_time = datetime.utcnow()
+        self._start_monotonic = time.monotonic()
         logger.debug(f"TaskTracker initialized with loop ID: {self._loop_id}")
     
     def track_task(self, task: asyncio.Task) -> None:
@@ -99,7 +99,7 @@ class TaskTracker:
         Returns:
             Uptime in seconds
         """
-        return (datetime.utcnow() - self._start_time).total_seconds()
+        return time.monotonic() - self._start_monotonic
     
     def __del__(self):
         """Cleanup when the tracker is destroyed."""
@@ -83,6 +83,16 @@ class TaskManager:
         self.running = False
         self._process_task_future = None
         self.initialized = False
+        
+        # Task handlers by task type
+        self._handlers = {
+            TaskType.CODE_ANALYSIS: self._process_code_analysis,
+            TaskType.PATTERN_EXTRACTION: self._extract_patterns,
+            TaskType.DOCUMENTATION: self._generate_documentation,
+            TaskType.DOCUMENTATION_CRAWL: self._crawl_documentation,
+            TaskType.DEBUG: self._debug_issue,
+            TaskType.ADR: self._process_adr,
+        }
     
     async def initialize(self):
         """Initialize task manager and start processing tasks."""
@@ -225,9 +235,10 @@ class TaskManager:
         if error:
             task.error = error
             
-        task.updated_at = datetime.utcnow()
+        now = datetime.utcnow()
+        task.updated_at = now
         if status == "completed":
-            task.completed_at = datetime.utcnow()
+            task.completed_at = now
             
         await self._save_task(task)
         return task
@@ -279,20 +290,10 @@ class TaskManager:
                 
                 try:
                     # Process task based on type
-                    if task.type == TaskType.CODE_ANALYSIS:
-                        await self._process_code_analysis(task)
-                    elif task.type == TaskType.PATTERN_EXTRACTION:
-                        result = await self._extract_patterns(task)
-                    elif task.type == TaskType.DOCUMENTATION:
-                        result = await self._generate_documentation(task)
-                    elif task.type == TaskType.DOCUMENTATION_CRAWL:
-                        result = await self._crawl_documentation(task)
-                    elif task.type == TaskType.DEBUG:
-                        result = await self._debug_issue(task)
-                    elif task.type == TaskType.ADR:
-                        result = await self._process_adr(task)
-                    else:
+                    handler = self._handlers.get(task.type)
+                    if handler is None:
                         raise ValueError(f"Unknown task type: {task.type}")
+                    result = await handler(task)
                         
                     # Update task with result
                     task.result = result
@@ -303,8 +304,9 @@ class TaskManager:
                     task.error = str(e)
                     task.status = TaskStatus.FAILED
                     
-                task.completed_at = datetime.utcnow()
-                task.updated_at = datetime.utcnow()
+                now = datetime.utcnow()
+                task.completed_at = now
+                task.updated_at = now
                 
                 # Mark task as done in the queue
                 self.task_queue.task_done()
@@ -450,8 +452,9 @@ class TaskManager:
             
             task.status = TaskStatus.COMPLETED
             task.result = {"total_documents": total_documents}
-            task.updated_at = datetime.utcnow()
-            task.completed_at = datetime.utcnow()
+            now = datetime.utcnow()
+            task.updated_at = now
+            task.completed_at = now
             await self._save_task(task)
             
         except Exception as e:
@@ -52,6 +52,8 @@ class VectorStore:
         self.vector_name = vector_name  # Store the vector name
         self.initialized = False
         self.client = None
+        # Incremented on every write so callers can invalidate cached results
+        self.generation = 0
     
     async def initialize(self):
         """Initialize vector store."""
@@ -151,6 +153,7 @@ class VectorStore:
                         filter=rest.Filter()  # Empty filter means all points
                     )
                 )
+                self.generation += 1
                 logger.debug(f"Successfully deleted all points from {self.collection_name}")
             except Exception as e:
                 logger.warning(f"Error deleting points from collection {self.collection_name}: {e}")
@@ -284,6 +287,7 @@ class VectorStore:
                 points=[point],
                 wait=True
             )
+            self.generation += 1
             logger.info(f"Successfully stored pattern with id: {id}")
             return True
         except Exception as e:
@@ -330,11 +334,68 @@ class VectorStore:
                 points=[point],
                 wait=True
             )
+            self.generation += 1
             return True
         except Exception as e:
             logger.error(f"Error updating pattern: {str(e)}")
             raise RuntimeError(f"Failed to update pattern: {str(e)}")
     
+    async def store_patterns(self, patterns: List[Dict]) -> bool:
+        """Store several patterns with precomputed embeddings in one upsert.
+        
+        Args:
+            patterns: Dictionaries with the same keys as the explicit
+                arguments of store_pattern (id, title, description,
+                pattern_type, tags, embedding)
+            
+        Returns:
+            True if stored successfully
+        """
+        if not patterns:
+            return True
+            
+        try:
+            if not self.initialized:
+                await self.initialize()
+                
+            timestamp = datetime.now().isoformat()
+            points = []
+            for pattern in patterns:
+                pattern_type = pattern.get("pattern_type") or "code"
+                points.append(rest.PointStruct(
+                    id=pattern["id"],
+                    vector=pattern["embedding"],
+                    payload={
+                        "id": pattern["id"],
+                        "title": pattern.get("title") or "Untitled",
+                        "description": pattern.get("description") or "",
+                        "pattern_type": pattern_type,
+                        "type": pattern_type,  # Add 'type' field for consistency
+                        "tags": pattern.get("tags") or [],
+                        "timestamp": timestamp,
+                    }
+                ))
+                
+            self.client.upsert(
+                collection_name=self.collection_name,
+                points=points,
+                wait=True
+            )
+            self.generation += 1
+            logger.info(f"Successfully stored {len(points)} patterns")
+            return True
+        except Exception as e:
+            logger.error(f"Error storing patterns: {str(e)}")
+            raise RuntimeError(f"Failed to store patterns: {str(e)}")
+    
+    async def count(self) -> int:
+        """Return the number of points in the collection."""
+        result = self.client.count(
+            collection_name=self.collection_name,
+            exact=True
+        )
+        return result.count
+    
     async def delete_pattern(self, id: str) -> None:
         """Delete pattern from vector store."""
         self.client.delete(
@@ -343,17 +404,47 @@ class VectorStore:
                 points=[id]
             )
         )
+        self.generation += 1
     
     async def search(
         self,
         text: str,
         filter_conditions: Optional[Dict] = None,
-        limit: int = 5
+        limit: int = 5,
+        score_threshold: Optional[float] = None
     ) -> List[SearchResult]:
         """Search for similar patterns."""
         # Generate embedding
         vector = await self.embedder.embed(text)
+        return await self.search_by_vector(
+            vector,
+            filter_conditions=filter_conditions,
+            limit=limit,
+            text=text,
+            score_threshold=score_threshold
+        )
+    
+    async def search_by_vector(
+        self,
+        vector: List[float],
+        filter_conditions: Optional[Dict] = None,
+        limit: int = 5,
+        text: str = "",
+        score_threshold: Optional[float] = None
+    ) -> List[SearchResult]:
+        """Search for patterns similar to an already computed embedding.
         
+        Args:
+            vector: Query embedding
+            filter_conditions: Optional filter conditions
+            limit: Maximum number of results to return; with a score
+                threshold, this caps the results that pass it
+            text: Query text, used for the default result description
+            score_threshold: Optional minimum score, applied by Qdrant
+            
+        Returns:
+            List of search results
+        """
         # Create filter if provided
         search_filter = None
         if filter_conditions:
@@ -364,9 +455,65 @@ class VectorStore:
             collection_name=self.collection_name,
             query=vector,
             query_filter=search_filter,
-            limit=limit
+            limit=limit,
+            score_threshold=score_threshold
+        )
+        
+        return self._to_search_results(getattr(results, "points", results), text)
+    
+    async def search_batch(
+        self,
+        vectors: List[List[float]],
+        filter_conditions: Optional[Dict] = None,
+        limit: int = 5,
+        texts: Optional[List[str]] = None,
+        score_threshold: Optional[float] = None,
+        payload_fields: Optional[List[str]] = None
+    ) -> List[List[SearchResult]]:
+        """Search for patterns similar to several embeddings in one request.
+        
+        Args:
+            vectors: Query embeddings
+            filter_conditions: Optional filter conditions shared by all queries
+            limit: Maximum number of results to return per query
+            texts: Query texts, used for the default result descriptions
+            score_threshold: Optional minimum score, applied by Qdrant
+            payload_fields: Optional payload keys to return; all are
+                returned by default
+            
+        Returns:
+            List of search results for each query, in order
+        """
+        if not vectors:
+            return []
+            
+        # Create filter if provided
+        search_filter = None
+        if filter_conditions:
+            search_filter = rest.Filter(**filter_conditions)
+            
+        responses = self.client.query_batch_points(
+            collection_name=self.collection_name,
+            requests=[
+                rest.QueryRequest(
+                    query=vector,
+                    filter=search_filter,
+                    limit=limit,
+                    score_threshold=score_threshold,
+                    with_payload=payload_fields or True
+                )
+                for vector in vectors
+            ]
         )
         
+        texts = texts or [""] * len(vectors)
+        return [
+            self._to_search_results(getattr(response, "points", response), text)
+            for response, text in zip(responses, texts)
+        ]
+    
+    def _to_search_results(self, results, text: str) -> List[SearchResult]:
+        """Convert Qdrant query results to SearchResult objects."""
         # Convert to SearchResult objects
         search_results = []
         
@@ -496,6 +643,7 @@ class VectorStore:
                 points=[point],
                 wait=True
             )
+            self.generation += 1
             logger.info(f"Successfully stored vector with id: {id}")
             return id
         except Exception as e:
@@ -443,11 +443,9 @@ def create_app(config: ServerConfig) -> FastAPI:
                 patterns = await kb.list_patterns(
                     pattern_type=pattern_type,
                     confidence=pattern_confidence,
-                    tags=tag_list
+                    tags=tag_list,
+                    limit=limit
                 )
-                
-                # Apply limit after getting all patterns
-                patterns = patterns[:limit]
             except Exception as e:
                 logger.error(f"Error listing patterns from knowledge base: {e}", exc_info=True)
                 # Return empty list in case of error
@@ -45,8 +45,13 @@ class Logger:
         
         # Create logger
         self.logger = structlog.get_logger(name)
+        self.stdlib_logger = logging.getLogger(name)
         self.extra = extra or {}
     
+    def isEnabledFor(self, level: int) -> bool:
+        """Check whether messages at the given level would be logged."""
+        return self.stdlib_logger.isEnabledFor(level)
+    
     def bind(self, **kwargs) -> "Logger":
         """Create new logger with additional context."""
         extra = {**self.extra, **kwargs}
@@ -0,0 +1,60 @@
+import sys
+import os
+
+# Ensure the src directory is in the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+import shutil
+import pytest
+import pytest_asyncio
+from src.mcp_codebase_insight.core.adr import ADRManager, ADRStatus
+from src.mcp_codebase_insight.core.config import ServerConfig
+
+CONTEXT = {"problem": "Listing is slow", "constraints": ["No new dependencies"]}
+
+@pytest_asyncio.fixture
+async def adr_manager(tmp_path):
+    """Create an ADR manager writing to a temporary directory."""
+    manager = ADRManager(ServerConfig(adr_dir=tmp_path / "adrs"))
+    await manager.initialize()
+    yield manager
+    await manager.cleanup()
+
+@pytest.mark.asyncio
+async def test_listing_is_invalidated_after_a_write(adr_manager: ADRManager):
+    """Test that cached listings reflect ADRs created and updated since."""
+    first = await adr_manager.create_adr("First", CONTEXT, [], "Cache listings")
+    assert [adr.title for adr in await adr_manager.list_adrs()] == ["First"]
+    assert await adr_manager.list_adrs(status=ADRStatus.ACCEPTED) == []
+
+    second = await adr_manager.create_adr("Second", CONTEXT, [], "Keep them fresh")
+    await adr_manager.update_adr(first.id, status=ADRStatus.ACCEPTED)
+
+    assert [adr.title for adr in await adr_manager.list_adrs()] == ["First", "Second"]
+    accepted = await adr_manager.list_adrs(status=ADRStatus.ACCEPTED)
+    assert [adr.id for adr in accepted] == [first.id]
+    proposed = await adr_manager.list_adrs(status=ADRStatus.PROPOSED)
+    assert [adr.id for adr in proposed] == [second.id]
+    assert [adr.title for adr in await adr_manager.list_adrs(limit=1)] == ["First"]
+
+@pytest.mark.asyncio
+async def test_listed_adrs_are_copies(adr_manager: ADRManager):
+    """Test that changing a listed ADR does not change later listings."""
+    await adr_manager.create_adr("Original", CONTEXT, [], "Decision")
+
+    listed = await adr_manager.list_adrs()
+    listed[0].title = "Changed"
+    listed[0].context.constraints.append("Leaked")
+
+    relisted = await adr_manager.list_adrs()
+    assert relisted[0].title == "Original"
+    assert relisted[0].context.constraints == ["No new dependencies"]
+
+@pytest.mark.asyncio
+async def test_missing_directory_lists_nothing(adr_manager: ADRManager):
+    """Test that a removed ADR directory yields an empty listing."""
+    await adr_manager.create_adr("Doomed", CONTEXT, [], "Decision")
+    assert len(await adr_manager.list_adrs()) == 1
+
+    shutil.rmtree(adr_manager.adr_dir)
+    assert await adr_manager.list_adrs() == []
@@ -0,0 +1,146 @@
+import sys
+import os
+
+# Ensure the src directory is in the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+import math
+import pytest
+import pytest_asyncio
+from src.mcp_codebase_insight.core.config import ServerConfig
+from src.mcp_codebase_insight.core.knowledge import KnowledgeBase, PatternConfidence, PatternType
+
+# Embedding dimensions: one per keyword, counting its occurrences
+KEYWORDS = ("alpha", "beta", "gamma", "delta")
+
+class KeywordEmbedder:
+    """Embeds text as keyword counts, so similarities are predictable."""
+
+    async def embed(self, text: str):
+        return [float(text.count(word)) for word in KEYWORDS]
+
+    async def embed_batch(self, texts, batch_size: int = 32):
+        return [await self.embed(text) for text in texts]
+
+class FakeVectorStore:
+    """In-memory stand-in for VectorStore that records remote searches."""
+
+    vector_size = len(KEYWORDS)
+
+    def __init__(self):
+        self.embedder = KeywordEmbedder()
+        self.points = {}
+        self.searches = 0
+
+    async def initialize(self):
+        pass
+
+    async def cleanup(self):
+        pass
+
+    async def count(self):
+        return len(self.points)
+
+    async def store_patterns(self, patterns):
+        for pattern in patterns:
+            self.points[pattern["id"]] = pattern
+        return True
+
+    async def update_pattern(self, id, **kwargs):
+        self.points[id] = kwargs
+        return True
+
+    async def delete_pattern(self, id):
+        self.points.pop(id, None)
+
+    async def search_by_vector(self, vector, filter_conditions=None, limit=5, **kwargs):
+        self.searches += 1
+        return []
+
+@pytest_asyncio.fixture
+async def knowledge_base(tmp_path):
+    """Create a knowledge base backed by the fake vector store."""
+    config = ServerConfig(kb_storage_dir=tmp_path / "knowledge", metrics_enabled=False)
+    kb = KnowledgeBase(config, FakeVectorStore())
+    await kb.initialize()
+    yield kb
+    await kb.cleanup()
+
+async def _add(kb: KnowledgeBase, name: str, type: PatternType = PatternType.CODE):
+    return await kb.add_pattern(
+        name=name,
+        type=type,
+        description="",
+        content="",
+        confidence=PatternConfidence.MEDIUM,
+        tags=[name.split()[0]]
+    )
+
+@pytest.mark.asyncio
+async def test_small_knowledge_base_is_searched_in_process(knowledge_base: KnowledgeBase):
+    """Test that similarity search ranks patterns locally without the vector store."""
+    alpha = await _add(knowledge_base, "alpha")
+    await _add(knowledge_base, "alpha beta")
+    await _add(knowledge_base, "gamma", PatternType.ARCHITECTURE)
+
+    assert knowledge_base._can_search_locally()
+    results = await knowledge_base.find_similar_patterns("alpha", limit=2)
+
+    assert knowledge_base.vector_store.searches == 0
+    assert [r.pattern.name for r in results] == ["alpha", "alpha beta"]
+    assert results[0].pattern.id == alpha.id
+    assert results[0].similarity_score == pytest.approx(1.0)
+    assert results[1].similarity_score == pytest.approx(1 / math.sqrt(2))
+
+@pytest.mark.asyncio
+async def test_local_search_applies_filters(knowledge_base: KnowledgeBase):
+    """Test that local search honours type and tag filters."""
+    await _add(knowledge_base, "alpha")
+    gamma = await _add(knowledge_base, "gamma", PatternType.ARCHITECTURE)
+
+    results = await knowledge_base.find_similar_patterns(
+        "alpha", pattern_type=PatternType.ARCHITECTURE, limit=5
+    )
+    assert [r.pattern.id for r in results] == [gamma.id]
+
+    results = await knowledge_base.find_similar_patterns("alpha", tags=["missing"])
+    assert results == []
+
+@pytest.mark.asyncio
+async def test_local_search_handles_zero_embeddings(knowledge_base: KnowledgeBase):
+    """Test that zero embeddings score 0 instead of NaN."""
+    # The initial pattern contains no keywords, so its embedding is zero
+    await _add(knowledge_base, "delta")
+
+    results = await knowledge_base.find_similar_patterns("delta", limit=5)
+    scores = [r.similarity_score for r in results]
+    assert scores[0] == pytest.approx(1.0)
+    assert all(not math.isnan(score) for score in scores)
+
+    results = await knowledge_base.find_similar_patterns("no keywords here", limit=5)
+    assert all(r.similarity_score == 0.0 for r in results)
+
+@pytest.mark.asyncio
+async def test_empty_vector_store_is_restored_from_disk(tmp_path):
+    """Test that persisted embeddings re-seed an empty vector store on startup."""
+    config = ServerConfig(kb_storage_dir=tmp_path / "knowledge", metrics_enabled=False)
+    kb = KnowledgeBase(config, FakeVectorStore())
+    await kb.initialize()
+    alpha = await _add(kb, "alpha beta")
+    await kb.cleanup()
+
+    # The initial pattern's embedding now comes from a model of another size
+    initial = next(i for i in kb._pattern_index if i != alpha.id)
+    (kb._patterns_dir / f"{initial}.emb").write_bytes(b"\0" * 4)
+
+    store = FakeVectorStore()
+    restored = KnowledgeBase(config, store)
+    await restored.initialize()
+    try:
+        assert str(alpha.id) in store.points
+        point = store.points[str(alpha.id)]
+        assert point["title"] == "alpha beta"
+        assert point["embedding"] == [1.0, 1.0, 0.0, 0.0]
+        assert str(initial) not in store.points
+    finally:
+        await restored.cleanup()
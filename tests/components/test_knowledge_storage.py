@@ -0,0 +1,131 @@
+import sys
+import os
+
+# Ensure the src directory is in the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+import pytest
+from src.mcp_codebase_insight.core.config import ServerConfig
+from src.mcp_codebase_insight.core.knowledge import (
+    FileRelationship, KnowledgeBase, PatternConfidence, PatternType, WebSource, _stable_filename
+)
+
+@pytest.fixture
+def storage_config(tmp_path) -> ServerConfig:
+    """Create a configuration whose knowledge base lives in a temporary directory."""
+    return ServerConfig(kb_storage_dir=tmp_path / "knowledge", metrics_enabled=False)
+
+@pytest.mark.asyncio
+async def test_cleanup_flushes_pending_changes(storage_config: ServerConfig):
+    """Test that cleanup writes changes the periodic flusher has not saved yet."""
+    kb = KnowledgeBase(storage_config)
+    await kb.initialize()
+
+    await kb.add_file_relationship("a.py", "b.py", "imports")
+    await kb.add_web_source("https://example.com/docs", "Docs", "documentation")
+
+    # Nothing is on disk until the flusher or cleanup runs
+    rel_path = kb._rels_dir / _stable_filename("a.py:b.py")
+    source_path = kb._web_dir / _stable_filename("https://example.com/docs")
+    assert not rel_path.exists()
+    assert not source_path.exists()
+
+    await kb.cleanup()
+
+    assert rel_path.exists()
+    assert source_path.exists()
+    assert not kb._dirty_rels
+    assert not kb._dirty_sources
+
+    # A new knowledge base loads what was flushed
+    reloaded = KnowledgeBase(storage_config)
+    await reloaded.initialize()
+    try:
+        relationships = await reloaded.get_file_relationships(source_file="a.py")
+        assert [r.target_file for r in relationships] == ["b.py"]
+        sources = await reloaded.get_web_sources()
+        assert [s.url for s in sources] == ["https://example.com/docs"]
+    finally:
+        await reloaded.cleanup()
+
+@pytest.mark.asyncio
+async def test_writer_persists_latest_pattern_on_cleanup(storage_config: ServerConfig):
+    """Test that queued pattern writes are readable at once and flushed on cleanup."""
+    kb = KnowledgeBase(storage_config)
+    await kb.initialize()
+
+    pattern = await kb.add_pattern(
+        name="Queued Pattern",
+        type=PatternType.CODE,
+        description="First version",
+        content="def queued(): pass",
+        confidence=PatternConfidence.MEDIUM
+    )
+    await kb.update_pattern(pattern.id, description="Second version")
+    await kb.update_pattern(pattern.id, description="Third version")
+
+    # Reads see the latest version whether or not it reached disk yet
+    retrieved = await kb.get_pattern(pattern.id)
+    assert retrieved.description == "Third version"
+
+    await kb.cleanup()
+
+    pattern_path = kb._patterns_dir / f"{pattern.id}.json"
+    assert not kb._pending_saves
+    assert "Third version" in pattern_path.read_text()
+    assert not list(kb._patterns_dir.glob("*.tmp"))
+
+@pytest.mark.asyncio
+async def test_hash_named_files_are_migrated(storage_config: ServerConfig):
+    """Test that files saved under per-process hash() names are renamed to stable digests."""
+    rels_dir = storage_config.kb_storage_dir / "relationships"
+    web_dir = storage_config.kb_storage_dir / "web_sources"
+    rels_dir.mkdir(parents=True)
+    web_dir.mkdir(parents=True)
+
+    relationship = FileRelationship(source_file="a.py", target_file="b.py", relationship_type="imports")
+    source = WebSource(url="https://example.com/guide", title="Guide", content_type="tutorial")
+    (rels_dir / f"{hash('a.py:b.py')}.json").write_text(relationship.model_dump_json())
+    (web_dir / f"{hash(source.url)}.json").write_text(source.model_dump_json())
+
+    kb = KnowledgeBase(storage_config)
+    await kb.initialize()
+    await kb.cleanup()
+
+    assert [p.name for p in rels_dir.glob("*.json")] == [_stable_filename("a.py:b.py")]
+    assert [p.name for p in web_dir.glob("*.json")] == [_stable_filename(source.url)]
+
+    # The migrated records load unchanged
+    reloaded = KnowledgeBase(storage_config)
+    await reloaded.initialize()
+    try:
+        relationships = await reloaded.get_file_relationships()
+        assert [r.model_dump() for r in relationships] == [relationship.model_dump()]
+        sources = await reloaded.get_web_sources()
+        assert [s.model_dump() for s in sources] == [source.model_dump()]
+    finally:
+        await reloaded.cleanup()
+
+@pytest.mark.asyncio
+async def test_filtered_relationships_keep_insertion_order(storage_config: ServerConfig):
+    """Test that relationship filters return matches in the order they were added."""
+    kb = KnowledgeBase(storage_config)
+    await kb.initialize()
+    try:
+        for source, target in [("z.py", "m.py"), ("a.py", "m.py"), ("z.py", "b.py"), ("z.py", "a.py")]:
+            await kb.add_file_relationship(source, target, "imports")
+        # Re-adding keeps the original position
+        await kb.add_file_relationship("z.py", "m.py", "calls")
+
+        everything = await kb.get_file_relationships()
+        by_source = await kb.get_file_relationships(source_file="z.py")
+        by_target = await kb.get_file_relationships(target_file="m.py")
+        both = await kb.get_file_relationships(source_file="z.py", target_file="b.py")
+
+        assert [r.target_file for r in by_source] == ["m.py", "b.py", "a.py"]
+        assert [r.source_file for r in by_target] == ["z.py", "a.py"]
+        assert [r.target_file for r in both] == ["b.py"]
+        assert by_source == [r for r in everything if r.source_file == "z.py"]
+        assert by_source[0].relationship_type == "calls"
+    finally:
+        await kb.cleanup()
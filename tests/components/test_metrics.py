@@ -0,0 +1,118 @@
+import sys
+import os
+
+# Ensure the src directory is in the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+import json
+import pytest
+from datetime import datetime, timedelta
+from src.mcp_codebase_insight.core.config import ServerConfig
+from src.mcp_codebase_insight.core import metrics as metrics_module
+from src.mcp_codebase_insight.core.metrics import Metric, MetricSeries, MetricsManager, MetricType
+
+@pytest.fixture
+def metrics_config(tmp_path) -> ServerConfig:
+    """Create a configuration whose metrics live in a temporary directory."""
+    return ServerConfig(docs_cache_dir=tmp_path / "docs", metrics_enabled=True)
+
+def _metric(value: float, timestamp: datetime) -> Metric:
+    return Metric(name="latency", type=MetricType.GAUGE, value=value, timestamp=timestamp)
+
+def test_metric_series_window():
+    """Test that a series grows past its capacity and finds time windows."""
+    start = datetime(2024, 1, 1)
+    series = MetricSeries(capacity=2)
+    for i in range(5):
+        series.append(_metric(i, start + timedelta(minutes=i)))
+
+    assert len(series) == 5
+    assert list(series.values[:len(series)]) == [0.0, 1.0, 2.0, 3.0, 4.0]
+
+    window = series.window(
+        (start + timedelta(minutes=1)).timestamp(),
+        (start + timedelta(minutes=3)).timestamp()
+    )
+    assert (window.start, window.stop) == (1, 4)
+    assert series.window() == slice(0, 5)
+
+def test_metric_series_drops_oldest_at_cap(monkeypatch):
+    """Test that a full series keeps only the most recent values."""
+    monkeypatch.setattr(metrics_module, "METRIC_HISTORY_SIZE", 4)
+    start = datetime(2024, 1, 1)
+    series = MetricSeries(capacity=2)
+    for i in range(9):
+        series.append(_metric(i, start + timedelta(seconds=i)))
+
+    # Trimmed back to 4 values once 8 were stored, then one more appended
+    assert len(series) == 5
+    assert list(series.values[:len(series)]) == [4.0, 5.0, 6.0, 7.0, 8.0]
+    assert series.timestamps[0] == start + timedelta(seconds=4)
+    assert len(series.types) == len(series.labels) == 5
+
+@pytest.mark.asyncio
+async def test_legacy_json_history_is_converted(metrics_config: ServerConfig):
+    """Test that a metric history saved as a JSON array is converted to NDJSON."""
+    metrics_dir = metrics_config.docs_cache_dir / "metrics"
+    metrics_dir.mkdir(parents=True)
+    start = datetime.utcnow() - timedelta(minutes=5)
+    legacy = [
+        {"name": "requests", "type": "counter", "value": i, "labels": None,
+         "timestamp": str(start + timedelta(seconds=i))}
+        for i in range(3)
+    ]
+    (metrics_dir / "requests.json").write_text(json.dumps(legacy, indent=2))
+
+    manager = MetricsManager(metrics_config)
+    await manager.initialize()
+    try:
+        assert not (metrics_dir / "requests.json").exists()
+        assert (metrics_dir / "requests.ndjson").exists()
+
+        metrics = await manager.get_metrics(["requests"])
+        assert [m["value"] for m in metrics["requests"]] == [0.0, 1.0, 2.0]
+
+        # New values are appended after the converted history
+        await manager.record_metric("requests", MetricType.COUNTER, 3)
+    finally:
+        await manager.cleanup()
+
+    reloaded = MetricsManager(metrics_config)
+    await reloaded.initialize()
+    try:
+        metrics = await reloaded.get_metrics(["requests"])
+        assert [m["value"] for m in metrics["requests"]] == [0.0, 1.0, 2.0, 3.0]
+    finally:
+        await reloaded.cleanup()
+
+@pytest.mark.asyncio
+async def test_ndjson_history_loads_on_first_access(metrics_config: ServerConfig):
+    """Test that saved histories are read lazily from their NDJSON files."""
+    manager = MetricsManager(metrics_config)
+    await manager.initialize()
+    try:
+        # More values than one flush, so the file is appended to twice
+        for i in range(metrics_module.METRIC_FLUSH_SIZE + 5):
+            await manager.record_metric("latency", MetricType.GAUGE, i)
+    finally:
+        await manager.cleanup()
+
+    metrics_dir = metrics_config.docs_cache_dir / "metrics"
+    (metrics_dir / "empty.ndjson").touch()
+
+    reloaded = MetricsManager(metrics_config)
+    await reloaded.initialize()
+    try:
+        assert not reloaded.metrics
+        assert set(reloaded._metric_files) == {"latency", "empty"}
+
+        summary = await reloaded.get_metric_summary("latency")
+        assert summary["count"] == metrics_module.METRIC_FLUSH_SIZE + 5
+        assert summary["last"] == float(metrics_module.METRIC_FLUSH_SIZE + 4)
+        assert "latency" in reloaded.metrics
+
+        metrics = await reloaded.get_metrics()
+        assert metrics["empty"] == []
+        assert len(metrics["latency"]) == metrics_module.METRIC_FLUSH_SIZE + 5
+    finally:
+        await reloaded.cleanup()
@@ -0,0 +1,69 @@
+import sys
+import os
+
+# Ensure the src directory is in the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+import pytest
+from src.mcp_codebase_insight.core.prompts import PromptManager, PromptType, _compile_template
+
+@pytest.fixture
+def prompt_manager() -> PromptManager:
+    """Create a prompt manager with the default templates."""
+    return PromptManager(config=None)
+
+def test_compiled_templates_match_str_format(prompt_manager: PromptManager):
+    """Test that every default template renders exactly as str.format would."""
+    for name, template in prompt_manager.templates.items():
+        assert prompt_manager._compiled[name] is not None
+        variables = {v: f"<{v}>" for v in template.variables}
+        assert prompt_manager.generate_prompt(name, variables) == template.template.format(**variables)
+
+def test_escaped_braces_and_format_specs(prompt_manager: PromptManager):
+    """Test literal braces and templates left to str.format."""
+    prompt_manager.add_template(
+        name="braces",
+        type=PromptType.CODE_ANALYSIS,
+        template="{{literal}} {value}",
+        variables=["value"]
+    )
+    assert prompt_manager.generate_prompt("braces", {"value": 1}) == "{literal} 1"
+
+    # Format specs are not compiled but still render
+    assert _compile_template("{score:.2f}") is None
+    prompt_manager.add_template(
+        name="spec",
+        type=PromptType.CODE_ANALYSIS,
+        template="score={score:.2f}",
+        variables=["score"]
+    )
+    assert prompt_manager.generate_prompt("spec", {"score": 0.5}) == "score=0.50"
+
+def test_update_template_recompiles(prompt_manager: PromptManager):
+    """Test that an updated template renders its new text."""
+    prompt_manager.add_template(
+        name="greeting",
+        type=PromptType.DOCUMENTATION,
+        template="Hello {name}",
+        variables=["name"]
+    )
+    prompt_manager.update_template("greeting", template="Goodbye {name}")
+
+    assert prompt_manager.generate_prompt("greeting", {"name": "Ada"}) == "Goodbye Ada"
+    assert prompt_manager.get_template("greeting").template == "Goodbye {name}"
+
+def test_generate_prompt_errors(prompt_manager: PromptManager):
+    """Test missing and undeclared variables."""
+    with pytest.raises(ValueError, match="Missing required variables: focus_areas"):
+        prompt_manager.generate_prompt("code_pattern_analysis", {"code": "x = 1"})
+
+    prompt_manager.add_template(
+        name="undeclared",
+        type=PromptType.DEBUG,
+        template="{declared} {other}",
+        variables=["declared"]
+    )
+    with pytest.raises(ValueError, match="Invalid variable"):
+        prompt_manager.generate_prompt("undeclared", {"declared": "a"})
+
+    assert prompt_manager.generate_prompt("no_such_template", {}) is None
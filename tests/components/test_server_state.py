@@ -0,0 +1,63 @@
+import sys
+import os
+
+# Ensure the src directory is in the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+import pytest
+import pytest_asyncio
+from src.mcp_codebase_insight.core.component_status import ComponentStatus
+from src.mcp_codebase_insight.core.state import ServerState, _COMPONENT_NAMES
+
+# ServerState starts a task tracker, which needs a running event loop
+pytestmark = pytest.mark.asyncio
+
+@pytest_asyncio.fixture
+async def server_state() -> ServerState:
+    """Create a server state with no registered components."""
+    return ServerState()
+
+async def test_components_keep_fixed_slots(server_state: ServerState):
+    """Test that built-in components keep their order and extra ones are appended."""
+    server_state.register_component("plugin")
+    server_state.register_component("vector_store")
+    server_state.register_component("database")
+
+    # Built-in components list in initialization order, extras after them
+    assert server_state.list_components() == ["database", "vector_store", "plugin"]
+    assert server_state._component_index["plugin"] == len(_COMPONENT_NAMES)
+
+    # Registering again keeps the existing state
+    server_state.update_component_status("plugin", ComponentStatus.INITIALIZED, instance="p")
+    server_state.register_component("plugin")
+    assert server_state.get_component("plugin") == "p"
+
+async def test_get_component_requires_initialized(server_state: ServerState):
+    """Test component lookup for unknown, pending and initialized components."""
+    assert server_state.get_component("unknown") is None
+
+    server_state.update_component_status("vector_store", ComponentStatus.INITIALIZING)
+    assert server_state.get_component("vector_store") is None
+
+    instance = object()
+    server_state.update_component_status("vector_store", ComponentStatus.INITIALIZED, instance=instance)
+    assert server_state.get_component("vector_store") is instance
+
+    server_state.update_component_status("vector_store", ComponentStatus.FAILED, error="boom")
+    assert server_state._component_state("vector_store").retry_count == 1
+
+async def test_component_status_is_refreshed_and_copied(server_state: ServerState):
+    """Test that status snapshots follow updates and cannot corrupt the cache."""
+    server_state.update_component_status("database", ComponentStatus.INITIALIZED)
+    status = server_state.get_component_status()
+    assert status["database"]["status"] == ComponentStatus.INITIALIZED.value
+
+    # Changing the returned mapping does not affect later calls
+    status.pop("database")
+    status["bogus"] = {}
+    assert set(server_state.get_component_status()) == {"database"}
+
+    server_state.update_component_status("database", ComponentStatus.FAILED, error="down")
+    status = server_state.get_component_status()
+    assert status["database"]["status"] == ComponentStatus.FAILED.value
+    assert status["database"]["error"] == "down"
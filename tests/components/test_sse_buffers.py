@@ -0,0 +1,144 @@
+"""Unit tests for SSE connection buffers and batched vector search."""
+
+import sys
+import os
+
+# Ensure the src directory is in the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+import asyncio
+import pytest
+
+from src.mcp_codebase_insight.core.sse import BatchedSearcher, CodebaseInsightSseTransport, MessageRing
+
+# Mark all tests as asyncio tests
+pytestmark = pytest.mark.asyncio
+
+
+class BatchStore:
+    """Vector store stub recording the size of each batched search."""
+
+    def __init__(self, delay: float = 0):
+        self.delay = delay
+        self.batches = []
+
+    async def search_batch(self, vectors, filter_conditions=None, limit=5, texts=None,
+                           score_threshold=None, payload_fields=None):
+        self.batches.append(len(vectors))
+        await asyncio.sleep(self.delay)
+        return [[(text, limit)] for text in texts]
+
+
+async def test_ring_wraps_around():
+    """Test that messages keep their order as the indices wrap past the capacity."""
+    ring = MessageRing(4)
+    received = []
+    for start in range(0, 12, 3):
+        for i in range(start, start + 3):
+            assert ring.put_nowait(i)
+        received.extend(await ring.get())
+
+    assert received == list(range(12))
+    assert ring.head == ring.tail == 12
+    assert len(ring) == 0
+    assert ring.dropped == 0
+
+
+async def test_ring_drops_oldest_when_full():
+    """Test that a full ring overwrites its oldest messages."""
+    ring = MessageRing(4)
+    delivered = [ring.put_nowait(i) for i in range(6)]
+
+    assert delivered == [True, True, True, True, False, False]
+    assert ring.full
+    assert ring.dropped == 2
+    assert await ring.get() == [2, 3, 4, 5]
+
+
+async def test_ring_wakes_reader_and_closes():
+    """Test that a waiting reader is woken by a message and by close()."""
+    ring = MessageRing(4)
+    reader = asyncio.create_task(ring.get())
+    await asyncio.sleep(0)
+    assert not reader.done()
+
+    ring.put_nowait("hello")
+    assert await asyncio.wait_for(reader, 1) == ["hello"]
+
+    reader = asyncio.create_task(ring.get())
+    await asyncio.sleep(0)
+    ring.close()
+    assert await asyncio.wait_for(reader, 1) == []
+    assert not ring.put_nowait("late")
+
+
+async def test_ring_capacity_must_be_power_of_two():
+    """Test that ring capacities are validated."""
+    with pytest.raises(ValueError):
+        MessageRing(6)
+
+
+async def test_transport_coalesces_and_counts_drops():
+    """Test that sends in one loop iteration reach a connection as one frame."""
+    transport = CodebaseInsightSseTransport("/sse")
+    connection_id, ring = await transport.open_connection()
+    assert transport.connection_count == 1
+
+    await transport.send({"a": 1})
+    await transport.send({"b": 2})
+    await asyncio.sleep(0)
+    assert await ring.get() == [b'data: {"a":1}\n\ndata: {"b":2}\n\n']
+
+    # Writes to a full ring drop its oldest frame and are counted
+    for i in range(ring.mask + 2):
+        await transport.send(i)
+        await asyncio.sleep(0)
+    assert transport.dropped_messages == 1
+
+    await transport.disconnect(connection_id)
+    assert transport.connection_count == 0
+    assert ring.closed
+
+
+async def test_lone_search_is_not_delayed():
+    """Test that a search alone in the queue skips the batch window."""
+    store = BatchStore()
+    searcher = BatchedSearcher(store, window=10)
+    try:
+        result = await asyncio.wait_for(searcher.search([0.1], text="q"), 1)
+    finally:
+        await searcher.stop()
+
+    assert result == [("q", 5)]
+    assert store.batches == [1]
+
+
+async def test_concurrent_searches_are_batched_by_shape():
+    """Test that queued searches sharing filters and limit share one request."""
+    store = BatchStore()
+    searcher = BatchedSearcher(store, window=0.01)
+    try:
+        results = await asyncio.gather(
+            *(searcher.search([float(i)], limit=3, text=f"q{i}") for i in range(4)),
+            searcher.search([9.0], limit=7, text="other")
+        )
+    finally:
+        await searcher.stop()
+
+    assert results == [[(f"q{i}", 3)] for i in range(4)] + [[("other", 7)]]
+    # All five were queued before the first batch, so they share one
+    # window and are grouped by limit
+    assert sorted(store.batches) == [1, 4]
+
+
+async def test_stop_cancels_pending_searches():
+    """Test that stop() cancels searches both queued and in flight."""
+    searcher = BatchedSearcher(BatchStore(delay=10), max_batch=2, window=0.01)
+    searches = [asyncio.ensure_future(searcher.search([float(i)], text=f"q{i}")) for i in range(5)]
+    await asyncio.sleep(0.05)
+
+    await searcher.stop()
+    await asyncio.sleep(0)
+
+    assert all(search.cancelled() for search in searches)
+    assert searcher.queue.empty()
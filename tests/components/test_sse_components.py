@@ -634,3 +634,92 @@ async def test_sse_timeout_handling():
         timed_out = True
     assert timed_out, "Operation should have timed out"
     mock_component.slow_operation.assert_called_once()
+
+
+class CachingVectorStore:
+    """Mock vector store exposing its embedder, batch search and write generation."""
+
+    def __init__(self):
+        self.generation = 0
+        self.searches = 0
+        self.embedder = MagicMock()
+        self.embedder.embed = AsyncMock(return_value=[0.1, 0.2])
+
+    async def search(self, text, filter_conditions=None, limit=5, score_threshold=None):
+        """Mock search method, unused when batch search is available."""
+        raise AssertionError("vector search should use search_batch")
+
+    async def search_batch(self, vectors, filter_conditions=None, limit=5, texts=None,
+                           score_threshold=None, payload_fields=None):
+        """Mock search_batch method returning one hit per query."""
+        self.searches += 1
+        return [
+            [MagicMock(id=f"hit-{self.searches}", score=0.9, metadata={"text": text})]
+            for text in texts
+        ]
+
+
+async def test_vector_search_cache_invalidated_after_write():
+    """Test that cached vector search results are dropped once the store changes."""
+    state = MockState()
+    store = CachingVectorStore()
+    state.set_component("vector_store", store)
+    server = MCP_CodebaseInsightServer(state)
+
+    with patch.object(server.mcp_server, 'add_tool') as mock_add_tool:
+        server._register_vector_search()
+    vector_search = mock_add_tool.call_args.kwargs["fn"]
+
+    try:
+        first = await vector_search("query")
+        assert first["results"][0].id == "hit-1"
+
+        # A repeated query is answered from the cache without embedding
+        assert await vector_search("query") == first
+        assert store.searches == 1
+        store.embedder.embed.assert_awaited_once()
+
+        # Changing a response does not leak into later cached responses
+        first["results"].clear()
+        first["extra"] = True
+        cached = await vector_search("query")
+        assert cached == {"results": [cached["results"][0]]}
+        assert cached["results"][0].id == "hit-1"
+
+        # Different arguments are cached separately
+        await vector_search("query", limit=2)
+        assert store.searches == 2
+
+        # A write to the store invalidates every cached response
+        store.generation += 1
+        refreshed = await vector_search("query")
+        assert store.searches == 3
+        assert refreshed["results"][0].id == "hit-3"
+
+        # Expired responses are fetched again
+        with patch('src.mcp_codebase_insight.core.sse.SEARCH_CACHE_TTL', 0):
+            await vector_search("fresh")
+            await vector_search("fresh")
+        assert store.searches == 5
+    finally:
+        await server.cleanup()
+
+
+async def test_vector_search_fallback_filters_scores():
+    """Test vector search against a store without the batched search API."""
+    state = MockState()
+    state.set_component("vector_store", MockVectorStore())
+    server = MCP_CodebaseInsightServer(state)
+
+    with patch.object(server.mcp_server, 'add_tool') as mock_add_tool:
+        server._register_vector_search()
+    vector_search = mock_add_tool.call_args.kwargs["fn"]
+
+    response = await vector_search("example", threshold=0.9)
+    assert [hit.id for hit in response["results"]] == ["test-id-1"]
+    assert response["results"][0].file_path == "/path/to/file.py"
+
+    # Scores below the threshold are dropped
+    response = await vector_search("example", threshold=0.99)
+    assert response["results"] == []
+    await server.cleanup()